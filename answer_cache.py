@@ -0,0 +1,95 @@
+"""최종 답변 캐시
+
+빠른 경로(`intent_router`)로 처리된 질문의 최종 답변을 세션 사이에 공유합니다. 키는
+함수 인자(API, 날짜, 학년/반, 필드, 학교)와 오늘 날짜이고, 그때 조회한 NEIS 데이터의 해시를 버전으로 씁니다.
+"오늘 급식 뭐야"와 "오늘 점심 메뉴?"처럼 데이터를 그대로 보여 달라는 질문(`intent_router.question_kind`가
+"lookup")만 캐시하고, "내일 급식에 우유 나와?"처럼 데이터 일부를 묻는 질문은 답이 질문마다 달라 캐시하지 않습니다.
+"오늘"/"내일" 같은 표현이 들어간 답변은 그날에만 씁니다.
+NEIS 데이터가 바뀌면 해시가 달라지므로 예전 답변은 버리고 새로 만듭니다."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 6 * 60 * 60
+DEFAULT_MAX_ITEMS = 1024
+
+
+def intent_key(args):
+    """검증된 함수 인자 dict를 순서와 무관한 문자열 키로"""
+    return json.dumps(args, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def data_version(data):
+    """NEIS 조회 결과의 내용 해시. 데이터가 바뀌면 값이 달라진다."""
+    raw = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """의도 키 -> (데이터 버전, 답변) 메모리 LRU 캐시. 여러 스레드에서 같이 써도 된다."""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_items=DEFAULT_MAX_ITEMS):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "invalidated": 0, "writes": 0}
+
+    def get(self, args, version):
+        """같은 의도와 같은 데이터로 만든 답변이 있으면 반환. 데이터가 바뀌었으면 지우고 None"""
+        key = intent_key(args)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, cached_version, answer = entry
+                if expires_at > now and cached_version == version:
+                    self._entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return answer
+                del self._entries[key]
+                if cached_version != version:
+                    self.counters["invalidated"] += 1
+            self.counters["misses"] += 1
+            return None
+
+    def set(self, args, version, answer):
+        if not answer:
+            return
+        key = intent_key(args)
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, version, answer)
+            self._entries.move_to_end(key)
+            self.counters["writes"] += 1
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """적중/미스/무효화 횟수와 적중률"""
+        with self._lock:
+            out = dict(self.counters)
+            out["items"] = len(self._entries)
+        total = out["hits"] + out["misses"]
+        out["hit_rate"] = out["hits"] / total if total else 0.0
+        return out
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """프로세스 전체(모든 Streamlit 세션)에서 공유하는 답변 캐시"""
+    global _answer_cache
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                _answer_cache = AnswerCache()
+    return _answer_cache
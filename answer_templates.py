@@ -0,0 +1,140 @@
+"""모델 호출 없이 NEIS 데이터를 한국어 답변으로 바로 만드는 템플릿
+
+빠른 경로(`intent_router`)로 의도가 확실한 질문은 답변이 NEIS 데이터를 그대로 옮기는 것뿐이라
+두 번째 모델 호출 없이 여기서 만든 문장을 그대로 보여줄 수 있습니다.
+답변은 말풍선 HTML 안에 들어가므로 줄바꿈은 `<br>`로 표시합니다.
+"""
+
+import datetime
+import re
+
+from intent_router import OTHER_MEALS
+from neis_parser import NeisError, parse_result
+
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+# 급식 메뉴 뒤에 붙는 알레르기 유발 식품 번호. 예: "돈육김치찌개(5.9.10.13)"
+ALLERGY_CODES = re.compile(r"\s*\((?:\d+\.)*\d+\.?\)")
+INFORM_LABELS = {
+    "SCHUL_NM": "학교명",
+    "ENG_SCHUL_NM": "영문 학교명",
+    "ORG_RDNMA": "주소",
+    "ORG_RDNDA": "상세주소",
+    "ORG_RDNZC": "우편번호",
+    "ORG_TELNO": "전화번호",
+    "ORG_FAXNO": "팩스번호",
+    "HMPG_ADRES": "홈페이지",
+    "FOAS_MEMRD": "개교기념일",
+    "FOND_YMD": "설립일",
+    "COEDU_SC_NM": "남녀공학 구분",
+}
+
+
+def format_date(yyyymmdd):
+    """20251218 -> 12월 18일(목)"""
+    try:
+        day = datetime.datetime.strptime(yyyymmdd, "%Y%m%d").date()
+    except (TypeError, ValueError):
+        return str(yyyymmdd)
+    return f"{day.month}월 {day.day}일({WEEKDAYS[day.weekday()]})"
+
+
+def format_ymd(value):
+    """개교기념일/설립일 같은 YYYYMMDD 값을 2025년 3월 2일 형식으로"""
+    try:
+        day = datetime.datetime.strptime(str(value), "%Y%m%d").date()
+    except ValueError:
+        return str(value)
+    return f"{day.year}년 {day.month}월 {day.day}일"
+
+
+def clean_dishes(ddish_nm):
+    """DDISH_NM을 알레르기 번호를 뗀 메뉴 리스트로"""
+    dishes = []
+    for dish in re.split(r"<br\s*/?>", ddish_nm or ""):
+        dish = ALLERGY_CODES.sub("", dish).strip()
+        if dish:
+            dishes.append(dish)
+    return dishes
+
+
+def _parsed(api_name, result, date):
+    """날짜별 레코드 리스트. 하나라도 오류 응답이면 None (모델에게 넘긴다)"""
+    parsed = parse_result(api_name, result, date)
+    if any(isinstance(records, NeisError) for _, records in parsed):
+        return None
+    return parsed
+
+
+def render_lunch(result, date):
+    """중식 메뉴 답변. 그날 조식/석식만 있으면 None (중식이 없다고 단정하지 않고 모델에게 넘긴다)"""
+    parts = []
+    for d, records in _parsed("lunch", result, date) or []:
+        meals = [m for m in records if (m.meal_name or "중식") == "중식"]
+        if not meals:
+            if records:
+                return None
+            parts.append(f"📅 {format_date(d)} 급식 정보가 없어요.")
+            continue
+        dishes = clean_dishes(meals[0].dishes)
+        parts.append(f"📅 {format_date(d)} 급식<br>" + "<br>".join(f"· {dish}" for dish in dishes))
+    return "<br><br>".join(parts) if parts else None
+
+
+def render_schedule(result, date, grade, classnum):
+    parts = []
+    for d, records in _parsed("schedule", result, date) or []:
+        if not records:
+            parts.append(f"📚 {format_date(d)} {grade}학년 {classnum}반 시간표 정보가 없어요.")
+            continue
+        periods = [f"{p.period or i}교시 {p.subject}" for i, p in enumerate(records, 1)]
+        parts.append(f"📚 {format_date(d)} {grade}학년 {classnum}반 시간표<br>" + "<br>".join(periods))
+    return "<br><br>".join(parts) if parts else None
+
+
+def render_year_sch(result, date):
+    parsed = _parsed("year_sch", result, date)
+    if parsed is None:
+        return None
+    lines = []
+    for d, records in parsed:
+        events = [e.name for e in records if e.name]
+        if events:
+            lines.append(f"📅 {format_date(d)}: {', '.join(events)}")
+    if not lines:
+        return "해당 날짜에는 등록된 학사일정이 없어요."
+    return "<br>".join(lines)
+
+
+def render_inform(result, info_type):
+    parsed = _parsed("inform", result, None)
+    if not parsed or not parsed[0][1] or info_type not in INFORM_LABELS:
+        return None
+    school = parsed[0][1][0]
+    value = school.fields.get(info_type)
+    if not value:
+        return None
+    if info_type in ("FOAS_MEMRD", "FOND_YMD"):
+        value = format_ymd(value)
+    if info_type == "SCHUL_NM":
+        return f"🏫 학교명: {value}"
+    return f"🏫 {school.name or '우리 학교'} {INFORM_LABELS[info_type]}: {value}"
+
+
+def render_answer(api_name, result, date=None, grade=None, classnum=None, info_type=None, question=None):
+    """`call_school_api` 결과로 최종 답변 문장을 만듭니다. 템플릿으로 답할 수 없으면 None.
+
+    question을 주면 급식 템플릿(중식)으로 답할 수 없는 질문(석식/조식)인지도 확인한다.
+    """
+    if isinstance(classnum, list):
+        return None
+    if api_name == "lunch":
+        if question and OTHER_MEALS.search(question):
+            return None
+        return render_lunch(result, date)
+    if api_name == "schedule":
+        return render_schedule(result, date, grade, classnum)
+    if api_name == "year_sch":
+        return render_year_sch(result, date)
+    if api_name == "inform":
+        return render_inform(result, info_type)
+    return None
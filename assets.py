@@ -0,0 +1,89 @@
+"""로고/아바타 정적 자산
+
+1.5MB짜리 `seohyun.png`를 화면마다 GitHub에서 받아 오지 않도록, 쓰이는 크기에 맞춘 작은 파일을
+`static/`에 만들어 두고 Streamlit 정적 파일 서빙(`.streamlit/config.toml`의 enableStaticServing)으로 제공합니다.
+말풍선마다 들어가는 32px 아바타는 data URI로 HTML에 바로 넣어 별도 요청이 없게 합니다.
+
+자산 다시 만들기 (Pillow 필요): `python assets.py`
+"""
+
+import base64
+import functools
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_IMAGE = os.path.join(BASE_DIR, "seohyun.png")
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+# enableStaticServing이 켜져 있으면 static/ 아래 파일이 이 경로로 제공된다.
+STATIC_URL = "app/static"
+# 자산 파일이 없을 때만 쓰는 원본 주소
+REMOTE_LOGO_URL = "https://github.com/hajing09-dev/ChatSHHS/blob/main/seohyun.png?raw=true"
+
+# 용도별 한 변 크기(px)
+SIZES = {"hero": 400, "header": 100, "avatar": 32}
+FORMATS = ("webp", "png")
+
+# 사용자 아바타: 외부 아이콘 대신 작은 SVG를 그대로 넣는다.
+USER_AVATAR = "data:image/svg+xml;base64," + base64.b64encode(
+    b"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'>"
+    b"<circle cx='16' cy='16' r='16' fill='#0097a7'/>"
+    b"<circle cx='16' cy='12' r='6' fill='#fff'/>"
+    b"<path d='M5 27c2-6 6-9 11-9s9 3 11 9' fill='#fff'/></svg>"
+).decode("ascii")
+
+
+def asset_name(variant, fmt="webp"):
+    return f"seohyun-{SIZES[variant]}.{fmt}"
+
+
+def asset_path(variant, fmt="webp"):
+    return os.path.join(STATIC_DIR, asset_name(variant, fmt))
+
+
+def static_url(variant, fmt="webp"):
+    """정적 서빙 URL. 자산 파일이 없으면 원본 주소"""
+    if not os.path.exists(asset_path(variant, fmt)):
+        return REMOTE_LOGO_URL
+    return f"{STATIC_URL}/{asset_name(variant, fmt)}"
+
+
+def hero_image():
+    """`st.image`에 넘길 첫 화면 로고 (로컬 파일 경로, 없으면 원본 주소)"""
+    path = asset_path("hero")
+    return path if os.path.exists(path) else REMOTE_LOGO_URL
+
+
+@functools.lru_cache(maxsize=None)
+def data_uri(variant, fmt="png"):
+    """작은 자산을 HTML에 바로 넣을 data URI로. 파일이 없으면 원본 주소"""
+    path = asset_path(variant, fmt)
+    if not os.path.exists(path):
+        return REMOTE_LOGO_URL
+    with open(path, "rb") as f:
+        return f"data:image/{fmt};base64," + base64.b64encode(f.read()).decode("ascii")
+
+
+def build_assets(source=SOURCE_IMAGE):
+    """원본 로고에서 크기별 WebP/PNG 자산을 만든다. 만든 파일 경로 리스트를 반환"""
+    from PIL import Image
+
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    written = []
+    with Image.open(source) as original:
+        original = original.convert("RGBA")
+        for variant in SIZES:
+            size = SIZES[variant]
+            image = original.resize((size, size), Image.LANCZOS)
+            for fmt in FORMATS:
+                path = asset_path(variant, fmt)
+                if fmt == "webp":
+                    image.save(path, "WEBP", quality=85, method=6)
+                else:
+                    image.quantize(colors=256, method=Image.FASTOCTREE).save(path, "PNG", optimize=True)
+                written.append(path)
+    return written
+
+
+if __name__ == "__main__":
+    for path in build_assets():
+        print(f"{os.path.relpath(path, BASE_DIR)}: {os.path.getsize(path):,} bytes")
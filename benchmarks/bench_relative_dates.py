@@ -0,0 +1,94 @@
+"""상대 날짜 변환 마이크로 벤치마크
+
+기존 구현(매 호출마다 17개 패턴 dict를 만들고 re.sub를 17번 실행)과
+`date_utils.resolve_relative_dates`(모듈 로드 시 컴파일한 정규식 하나로 한 번 스캔)를 비교합니다.
+
+실행:
+    python benchmarks/bench_relative_dates.py [반복 횟수]
+"""
+
+import datetime
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from date_utils import resolve_relative_dates  # noqa: E402
+
+CORPUS = [
+    "내일 급식 뭐야?",
+    "다음주 월요일 2학년 6반 시간표 알려줘",
+    "이번주 금요일에 무슨 행사 있어?",
+    "오늘 점심 메뉴?",
+    "12월 25일에 학교 쉬어?",
+    "학교 전화번호 알려줘",
+    "모레 석식 메뉴 알려줘",
+    "어제 급식 맛있었는데 뭐였지",
+    "그럼 5반은?",
+    "다음주 수요일이랑 목요일 급식 둘 다 알려줘",
+]
+
+
+def legacy_convert(text, today_kst):
+    """기존 convert_relative_date_in_text 구현 (비교용 사본)"""
+    days_since_sunday = (today_kst.weekday() + 1) % 7
+    this_week_start = today_kst - datetime.timedelta(days=days_since_sunday)
+    next_week_start = this_week_start + datetime.timedelta(days=7)
+    replacements = {
+        r'내일': (today_kst + datetime.timedelta(days=1)).strftime('%Y년 %m월 %d일'),
+        r'모레': (today_kst + datetime.timedelta(days=2)).strftime('%Y년 %m월 %d일'),
+        r'어제': (today_kst - datetime.timedelta(days=1)).strftime('%Y년 %m월 %d일'),
+        r'다음주\s*월요일': (next_week_start + datetime.timedelta(days=1)).strftime('%Y년 %m월 %d일'),
+        r'다음주\s*화요일': (next_week_start + datetime.timedelta(days=2)).strftime('%Y년 %m월 %d일'),
+        r'다음주\s*수요일': (next_week_start + datetime.timedelta(days=3)).strftime('%Y년 %m월 %d일'),
+        r'다음주\s*목요일': (next_week_start + datetime.timedelta(days=4)).strftime('%Y년 %m월 %d일'),
+        r'다음주\s*금요일': (next_week_start + datetime.timedelta(days=5)).strftime('%Y년 %m월 %d일'),
+        r'다음주\s*토요일': (next_week_start + datetime.timedelta(days=6)).strftime('%Y년 %m월 %d일'),
+        r'다음주\s*일요일': next_week_start.strftime('%Y년 %m월 %d일'),
+        r'이번주\s*월요일': (this_week_start + datetime.timedelta(days=1)).strftime('%Y년 %m월 %d일'),
+        r'이번주\s*화요일': (this_week_start + datetime.timedelta(days=2)).strftime('%Y년 %m월 %d일'),
+        r'이번주\s*수요일': (this_week_start + datetime.timedelta(days=3)).strftime('%Y년 %m월 %d일'),
+        r'이번주\s*목요일': (this_week_start + datetime.timedelta(days=4)).strftime('%Y년 %m월 %d일'),
+        r'이번주\s*금요일': (this_week_start + datetime.timedelta(days=5)).strftime('%Y년 %m월 %d일'),
+        r'이번주\s*토요일': (this_week_start + datetime.timedelta(days=6)).strftime('%Y년 %m월 %d일'),
+        r'이번주\s*일요일': this_week_start.strftime('%Y년 %m월 %d일'),
+    }
+    converted_text = text
+    for pattern, replacement in replacements.items():
+        converted_text = re.sub(pattern, replacement, converted_text)
+    return converted_text
+
+
+def check_compatible(today_kst):
+    """기존 구현이 지원하던 표현은 같은 결과를 내는지 확인"""
+    mismatches = []
+    for text in CORPUS:
+        if "오늘" in text or re.search(r"(?<!다음주 |이번주 )[월화수목금토일]요일", text):
+            continue  # 새 구현에서만 변환되는 표현
+        old = legacy_convert(text, today_kst)
+        new = resolve_relative_dates(text, today_kst)[0]
+        if old != new:
+            mismatches.append({"text": text, "legacy": old, "new": new})
+    return mismatches
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    today = datetime.date.today()
+    legacy = timeit.timeit(lambda: [legacy_convert(t, today) for t in CORPUS], number=number)
+    new = timeit.timeit(lambda: [resolve_relative_dates(t, today) for t in CORPUS], number=number)
+    calls = number * len(CORPUS)
+    print(json.dumps({
+        "calls": calls,
+        "legacy_us_per_call": round(legacy / calls * 1e6, 2),
+        "resolver_us_per_call": round(new / calls * 1e6, 2),
+        "speedup": round(legacy / new, 2),
+        "mismatches": check_compatible(today),
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""대화 턴 end-to-end 지연 벤치마크
+
+로컬 OpenAI/NEIS 대역 서버(`stub_servers.py`)를 띄우고 `ChatService.respond()`와 `schoolapi.get_school_info`를
+대표 질문 모음으로 실행해, 턴 지연 백분위, 턴당 왕복 수(OpenAI/NEIS), 처리량, 단계별 지연(telemetry)을
+JSON으로 출력합니다. 첫 번째 반복은 빈 캐시(cold), 이후 반복은 채워진 캐시(warm)로 따로 집계합니다.
+
+실행:
+    python benchmarks/bench_turns.py --profile typical --repeat 3 --concurrency 4 --output after.json
+    python benchmarks/bench_turns.py --baseline before.json     # 이전 결과와 p50/p95/처리량 비교
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from stub_servers import PROFILES, start_neis, start_openai  # noqa: E402
+
+# (종류, 대화) — 대화 안의 질문은 같은 세션에서 차례로 보낸다.
+CORPUS = [
+    ("lunch", ["오늘 급식 뭐야?"]),
+    ("lunch", ["내일 점심 메뉴 알려줘"]),
+    ("lunch", ["모레 급식 칼로리 얼마야?"]),
+    ("timetable", ["2학년 6반 오늘 시간표 알려줘"]),
+    ("timetable", ["다음주 월요일 1학년 3반 시간표"]),
+    ("year_sch", ["이번 주 학사일정 알려줘"]),
+    ("year_sch", ["다음주 금요일에 행사 있어?"]),
+    ("inform", ["학교 전화번호 알려줘"]),
+    ("inform", ["우리 학교 주소가 어떻게 돼?"]),
+    ("multi_date", ["다음주 수요일이랑 목요일 급식 둘 다 알려줘"]),
+    ("multi_date", ["다음주 월요일부터 금요일까지 급식 알려줘"]),
+    ("follow_up", ["다음주 월요일 2학년 6반 시간표 알려줘", "그럼 5반은?", "3학년 1반은?"]),
+    ("follow_up", ["내일 급식 뭐야?", "모레는?"]),
+    ("chitchat", ["안녕! 넌 뭘 할 수 있어?"]),
+]
+
+# get_school_info 직접 호출 (날짜는 실행 시점 기준 상대값)
+SCHOOL_INFO_QUERIES = [
+    ("lunch", dict(api_name="lunch", date=0)),
+    ("lunch_week", dict(api_name="lunch", date=range(0, 7))),
+    ("schedule", dict(api_name="schedule", date=1, grade=2, classnum=6)),
+    ("schedule_grade", dict(api_name="schedule", date=1, grade=2, classnum=list(range(1, 11)))),
+    ("year_sch_month", dict(api_name="year_sch", date=range(0, 30))),
+    ("inform", dict(api_name="inform", info_type="ORG_TELNO")),
+]
+
+
+def percentiles(samples):
+    """지연 리스트(초)의 요약 (밀리초)"""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def at(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 2)
+
+    return {"n": len(ordered), "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p50_ms": at(50), "p95_ms": at(95), "p99_ms": at(99), "max_ms": round(ordered[-1] * 1000, 2)}
+
+
+def resolve_dates(query, today):
+    """SCHOOL_INFO_QUERIES의 상대 날짜(오늘부터 며칠 뒤)를 YYYYMMDD로"""
+    query = dict(query)
+    offset = query.get("date")
+    if isinstance(offset, range):
+        query["date"] = [(today + datetime.timedelta(days=i)).strftime("%Y%m%d") for i in offset]
+    elif isinstance(offset, int):
+        query["date"] = (today + datetime.timedelta(days=offset)).strftime("%Y%m%d")
+    return query
+
+
+def run_conversation(service, turns, stream):
+    history, timings = [], []
+    for prompt in turns:
+        history.append({"role": "user", "content": prompt})
+        started = time.perf_counter()
+        answer = service.respond(prompt, history, (lambda text: None) if stream else None)
+        timings.append(time.perf_counter() - started)
+        history.append({"role": "assistant", "content": answer})
+    return timings
+
+
+def run_pass(service, neis, openai, concurrency, stream):
+    """CORPUS 전체를 한 번 실행. 턴 지연, 종류별 지연, 왕복 수, 처리량"""
+    neis.reset_counts()
+    openai.reset_counts()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda item: run_conversation(service, item[1], stream), CORPUS))
+    elapsed = time.perf_counter() - started
+    by_kind = {}
+    for (kind, _), timings in zip(CORPUS, results):
+        by_kind.setdefault(kind, []).extend(timings)
+    turns = sum(len(timings) for timings in results)
+    neis_calls, openai_calls = neis.reset_counts(), openai.reset_counts()
+    return {
+        "latency": [t for timings in results for t in timings],
+        "by_kind": by_kind,
+        "turns": turns,
+        "seconds": elapsed,
+        "neis_requests": sum(neis_calls.values()),
+        "neis_by_endpoint": neis_calls,
+        "openai_requests": sum(openai_calls.values()),
+    }
+
+
+def summarize_passes(passes):
+    if not passes:
+        return {}
+    turns = sum(p["turns"] for p in passes)
+    seconds = sum(p["seconds"] for p in passes)
+    endpoints = {}
+    for p in passes:
+        for name, count in p["neis_by_endpoint"].items():
+            endpoints[name] = endpoints.get(name, 0) + count
+    kinds = {}
+    for p in passes:
+        for kind, timings in p["by_kind"].items():
+            kinds.setdefault(kind, []).extend(timings)
+    return {
+        "latency": percentiles([t for p in passes for t in p["latency"]]),
+        "by_kind": {kind: percentiles(timings) for kind, timings in sorted(kinds.items())},
+        "turns": turns,
+        "throughput_turns_per_s": round(turns / seconds, 2) if seconds else None,
+        "openai_requests_per_turn": round(sum(p["openai_requests"] for p in passes) / turns, 3),
+        "neis_requests_per_turn": round(sum(p["neis_requests"] for p in passes) / turns, 3),
+        "neis_by_endpoint": endpoints,
+    }
+
+
+def run_school_info(schoolapi, neis, repeat, today):
+    """get_school_info 직접 호출 지연과 호출당 NEIS 왕복 수 (첫 회는 cold)"""
+    out = {}
+    for name, query in SCHOOL_INFO_QUERIES:
+        query = resolve_dates(query, today)
+        timings, requests = [], []
+        for _ in range(repeat):
+            neis.reset_counts()
+            started = time.perf_counter()
+            schoolapi.get_school_info(**query)
+            timings.append(time.perf_counter() - started)
+            requests.append(sum(neis.reset_counts().values()))
+        out[name] = {"cold_ms": round(timings[0] * 1000, 2), "cold_neis_requests": requests[0],
+                     "warm": percentiles(timings[1:]), "warm_neis_requests": sum(requests[1:])}
+    return out
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(current, baseline):
+    """같은 항목의 p50/p95/처리량 비율 (현재 / 기준, 1보다 작으면 빨라짐)"""
+    def ratio(a, b):
+        return round(a / b, 3) if a is not None and b else None
+
+    out = {}
+    for phase in ("cold", "warm"):
+        now, before = current["turns"].get(phase) or {}, baseline.get("turns", {}).get(phase) or {}
+        if not now or not before:
+            continue
+        out[phase] = {
+            "p50": ratio(now["latency"].get("p50_ms"), before["latency"].get("p50_ms")),
+            "p95": ratio(now["latency"].get("p95_ms"), before["latency"].get("p95_ms")),
+            "throughput": ratio(now.get("throughput_turns_per_s"), before.get("throughput_turns_per_s")),
+            "neis_requests_per_turn": ratio(now.get("neis_requests_per_turn"), before.get("neis_requests_per_turn")),
+            "openai_requests_per_turn": ratio(now.get("openai_requests_per_turn"), before.get("openai_requests_per_turn")),
+        }
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="respond()/get_school_info end-to-end 지연 벤치마크")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical", help="대역 서버 지연 설정")
+    parser.add_argument("--repeat", type=int, default=3, help="질문 모음 반복 횟수 (첫 회는 cold)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 진행할 대화 수")
+    parser.add_argument("--no-stream", action="store_true", help="최종 답변을 스트리밍 없이 받기")
+    parser.add_argument("--seed", type=int, default=0, help="대역 서버 지연 난수 시드")
+    parser.add_argument("--output", help="결과 JSON 파일 (없으면 표준 출력)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    neis = start_neis(args.profile, seed=args.seed)
+    openai = start_openai(args.profile, seed=args.seed + 1)
+    workdir = tempfile.mkdtemp(prefix="chatshhs-bench-")
+    # 앱 모듈은 주소/캐시 경로를 가져올 때 읽으므로 환경 변수를 먼저 정한다.
+    os.environ.update({
+        "NEIS_BASE_URL": f"{neis.url}/hub",
+        "NEIS_API_KEY": "bench",
+        "NEIS_CACHE_PATH": os.path.join(workdir, "neis_cache.sqlite3"),
+        "NEIS_PREFETCH_INTERVAL": "0",
+        "OPENAI_BASE_URL": f"{openai.url}/v1",
+        "OPENAI_API_KEY": "bench",
+        "TELEMETRY_PORT": "0",
+    })
+    import chat_service
+    import schoolapi
+    import telemetry
+    from answer_cache import get_answer_cache
+    from neis_cache import get_cache
+
+    service = chat_service.get_chat_service()
+    passes = [run_pass(service, neis, openai, args.concurrency, not args.no_stream) for _ in range(args.repeat)]
+    stages = telemetry.summary()
+
+    # get_school_info는 빈 캐시에서 따로 잰다.
+    get_cache().clear()
+    get_answer_cache().clear()
+    school_info = run_school_info(schoolapi, neis, max(2, args.repeat), chat_service.today_kst())
+
+    result = {
+        "meta": {
+            "profile": args.profile,
+            "repeat": args.repeat,
+            "concurrency": args.concurrency,
+            "stream": not args.no_stream,
+            "conversations": len(CORPUS),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "started": datetime.datetime.now().isoformat(timespec="seconds"),
+        },
+        "turns": {"cold": summarize_passes(passes[:1]), "warm": summarize_passes(passes[1:])},
+        "stages_ms": {stage: {k: round(v * 1000, 2) if k != "count" else v for k, v in values.items()}
+                      for stage, values in stages.items()},
+        "answer_cache": get_answer_cache().stats(),
+        "school_info": school_info,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["compare"] = compare(result, json.load(f))
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    neis.close()
+    openai.close()
+
+
+if __name__ == "__main__":
+    main()
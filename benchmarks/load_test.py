@@ -0,0 +1,355 @@
+"""동시 세션 부하 테스트 (Streamlit 앱 전체)
+
+점심시간처럼 많은 학생이 한꺼번에 질문하는 상황을 흉내 냅니다. `streamlit run`으로 앱 서버를 한 프로세스로
+띄우고, 브라우저 대신 웹소켓(`/_stcore/stream`) 클라이언트를 세션 수만큼 붙여 "채팅 시작하기" 클릭 →
+`st.chat_input` 입력 → `respond` → 말풍선 렌더링을 실제 배포와 같은 경로로 실행합니다. 질문 사이에는
+생각하는 시간(지수 분포)을 두고, 질문은 점심시간 비율(`QUESTION_MIX`)로 고릅니다.
+OpenAI/NEIS는 이 프로세스에서 띄운 로컬 대역 서버(`stub_servers.py`)를 씁니다.
+
+동시 세션 수를 단계별로 늘리며 처리량, 턴 지연/첫 토큰 지연 백분위, 오류율, 서버 프로세스의 세션당 메모리(RSS)와
+CPU 사용률을 JSON으로 출력하고, 오류율이나 p95가 한도를 넘는 첫 단계를 `breaking_point`로 표시합니다.
+메모리/CPU는 Linux의 /proc에서 읽으므로 다른 OS나 `--url`로 외부 서버를 지정한 경우에는 비어 있습니다.
+
+실행 (streamlit에 포함된 websockets 패키지 필요):
+    python benchmarks/load_test.py --ramp 1,10,25,50,100 --turns 4 --think 3 --output load.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(BENCH_DIR), "chatshhs_refactored.py")
+sys.path.insert(0, BENCH_DIR)
+
+from bench_turns import CORPUS, percentiles  # noqa: E402
+from stub_servers import PROFILES, start_neis, start_openai  # noqa: E402
+
+# 점심시간 질문 비율 (CORPUS의 종류별 가중치)
+QUESTION_MIX = {"lunch": 40, "timetable": 20, "year_sch": 10, "inform": 8, "multi_date": 7, "follow_up": 10,
+                "chitchat": 5}
+START_BUTTON_LABEL = "채팅 시작하기"
+# 한 번의 스크립트 실행을 기다릴 최대 시간(초). 넘기면 오류로 센다.
+TURN_TIMEOUT = 60
+SERVER_START_TIMEOUT = 60
+# 서버 메모리/CPU를 읽는 간격(초)
+SAMPLE_INTERVAL = 0.5
+
+
+def pick_conversation(rng):
+    kinds = list(QUESTION_MIX)
+    kind = rng.choices(kinds, weights=[QUESTION_MIX[k] for k in kinds])[0]
+    return rng.choice([turns for k, turns in CORPUS if k == kind])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(port, env):
+    """앱을 별도 프로세스로 띄우고 health 체크가 통과할 때까지 기다린다."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless", "true",
+         "--server.port", str(port), "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=os.path.dirname(APP_PATH),
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Streamlit 서버가 종료되었습니다 (코드 {server.returncode})")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.3)
+    server.terminate()
+    raise RuntimeError("Streamlit 서버가 시작되지 않았습니다")
+
+
+class ProcessSampler:
+    """/proc/<pid>에서 서버 프로세스의 RSS와 CPU 시간을 읽는다 (Linux 전용, 아니면 None)."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def rss(self):
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, TypeError):
+            return None
+        return None
+
+    def cpu_seconds(self):
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / self.ticks
+        except (OSError, TypeError, IndexError, ValueError):
+            return None
+
+
+class Session:
+    """웹소켓 하나로 브라우저 탭 하나(학생 한 명)를 흉내 낸다."""
+
+    def __init__(self, url, turns, think, seed):
+        self.url = url
+        self.turns = turns
+        self.think = think
+        self.rng = random.Random(seed)
+        self.latencies = []
+        self.first_tokens = []
+        self.errors = []
+        self.ws = None
+        self.chat_input = None  # (위젯 ID, 조각 ID)
+
+    async def run_script(self, widget=None, fragment_id=""):
+        """스크립트를 한 번 실행시키고 끝날 때까지 받는다.
+
+        반환값은 ([(요소 종류, Element, 조각 ID), ...], 걸린 시간, 첫 답변 말풍선까지 걸린 시간 또는 None)
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.SetInParent()
+        if widget is not None:
+            message.rerun_script.widget_states.widgets.append(widget)
+        if fragment_id:
+            message.rerun_script.fragment_id = fragment_id
+        started = time.perf_counter()
+        await self.ws.send(message.SerializeToString())
+        elements, first_token = [], None
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await asyncio.wait_for(self.ws.recv(), TURN_TIMEOUT))
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_kind = element.WhichOneof("type")
+                elements.append((element_kind, element, forward.delta.fragment_id))
+                if first_token is None and element_kind == "markdown" and "shhs-assistant" in element.markdown.body:
+                    first_token = time.perf_counter() - started
+            elif kind == "script_finished":
+                status = forward.script_finished
+                if status == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue  # st.rerun() 뒤에 이어지는 실행까지 기다린다
+                if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("스크립트 컴파일 오류")
+                return elements, time.perf_counter() - started, first_token
+
+    def remember_chat_input(self, elements):
+        for kind, element, fragment_id in elements:
+            if kind == "chat_input":
+                self.chat_input = (element.chat_input.id, fragment_id)
+
+    async def open(self):
+        import websockets
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        elements, _, _ = await self.run_script()
+        button = next((e.button for k, e, _ in elements if k == "button" and e.button.label == START_BUTTON_LABEL), None)
+        if button is not None:
+            elements, _, _ = await self.run_script(WidgetState(id=button.id, trigger_value=True))
+        self.remember_chat_input(elements)
+        if self.chat_input is None:
+            raise RuntimeError("채팅 입력창을 찾지 못했습니다")
+
+    async def ask(self, prompt):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget = WidgetState(id=self.chat_input[0])
+        widget.chat_input_value.data = prompt
+        try:
+            elements, elapsed, first_token = await self.run_script(widget, self.chat_input[1])
+        except Exception as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+            return
+        self.latencies.append(elapsed)
+        if first_token is not None:
+            self.first_tokens.append(first_token)
+        self.remember_chat_input(elements)
+        failures = [e.exception.message for k, e, _ in elements if k == "exception"]
+        if failures:
+            self.errors.append(failures[0])
+        elif not any(k == "markdown" and "shhs-assistant" in e.markdown.body for k, e, _ in elements):
+            self.errors.append("답변 말풍선이 그려지지 않음")
+
+    async def run(self, started_at):
+        await asyncio.sleep(started_at)
+        try:
+            await self.open()
+        except Exception as e:
+            self.errors.append(f"연결 실패: {type(e).__name__}: {e}")
+            return
+        asked = 0
+        try:
+            while asked < self.turns:
+                for prompt in pick_conversation(self.rng):
+                    if asked >= self.turns:
+                        break
+                    if self.think:
+                        await asyncio.sleep(min(self.rng.expovariate(1 / self.think), self.think * 5))
+                    await self.ask(prompt)
+                    asked += 1
+        finally:
+            await self.ws.close()
+
+
+async def sample(sampler, samples, stop):
+    while not stop.is_set():
+        rss = sampler.rss()
+        if rss is not None:
+            samples.append(rss)
+        try:
+            await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_stage(url, count, turns, think, spawn_seconds, seed, sampler):
+    """동시 세션 count개로 한 단계를 실행하고 요약을 반환"""
+    rng = random.Random(seed)
+    sessions = [Session(url, turns, think, seed * 1000 + i) for i in range(count)]
+    rss_before = sampler.rss() if sampler else None
+    cpu_before = sampler.cpu_seconds() if sampler else None
+    samples, stop = [], asyncio.Event()
+    watcher = asyncio.create_task(sample(sampler, samples, stop)) if sampler else None
+    started = time.perf_counter()
+    # 모든 세션이 같은 순간에 들어오지 않도록 spawn_seconds 동안 고르게 흩어 시작
+    await asyncio.gather(*(s.run(rng.uniform(0, spawn_seconds)) for s in sessions))
+    elapsed = time.perf_counter() - started
+    if watcher:
+        stop.set()
+        await watcher
+    latencies = [t for s in sessions for t in s.latencies]
+    errors = [e for s in sessions for e in s.errors]
+    attempts = len(latencies) + len(errors)
+    out = {
+        "sessions": count,
+        "turns": len(latencies),
+        "seconds": round(elapsed, 2),
+        "throughput_turns_per_s": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency": percentiles(latencies),
+        "first_token": percentiles([t for s in sessions for t in s.first_tokens]),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / attempts, 4) if attempts else 0.0,
+        "error_samples": sorted(set(errors))[:5],
+    }
+    if sampler and rss_before is not None and samples:
+        cpu_after = sampler.cpu_seconds()
+        out["server"] = {
+            "rss_before_mb": round(rss_before / 2**20, 1),
+            "rss_peak_mb": round(max(samples) / 2**20, 1),
+            "per_session_kb": round((max(samples) - rss_before) / count / 1024, 1),
+            "cpu_percent": round((cpu_after - cpu_before) / elapsed * 100, 1) if cpu_before is not None else None,
+        }
+    return out
+
+
+async def run_ramp(args, url, sampler):
+    # 첫 실행의 모듈 로드/클라이언트 생성이 첫 단계의 지연과 세션당 메모리에 섞이지 않도록 한 번 미리 실행
+    warmup = Session(url, 2, 0, args.seed)
+    await warmup.run(0)
+    if warmup.errors:
+        raise RuntimeError(f"준비 실행 실패: {warmup.errors[0]}")
+    stages, breaking_point = [], None
+    for count in args.ramp:
+        stage = await run_stage(url, count, args.turns, args.think, args.spawn, args.seed + len(stages), sampler)
+        stages.append(stage)
+        print(f"세션 {count}: {stage['throughput_turns_per_s']} 턴/초, p95 {stage['latency'].get('p95_ms')}ms, "
+              f"오류율 {stage['error_rate']:.1%}", file=sys.stderr)
+        p95 = stage["latency"].get("p95_ms")
+        if breaking_point is None and (stage["error_rate"] > args.max_error_rate
+                                       or (p95 is not None and p95 / 1000 > args.max_p95)):
+            breaking_point = count
+            if not args.keep_going:
+                break
+    return stages, breaking_point
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamlit 앱 동시 세션 부하 테스트")
+    parser.add_argument("--ramp", default="1,10,25,50", help="단계별 동시 세션 수 (쉼표로 구분)")
+    parser.add_argument("--turns", type=int, default=4, help="세션마다 보낼 질문 수")
+    parser.add_argument("--think", type=float, default=3.0, help="질문 사이 평균 생각 시간(초), 0이면 쉬지 않음")
+    parser.add_argument("--spawn", type=float, default=5.0, help="한 단계의 세션들을 몇 초에 걸쳐 시작할지")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical", help="대역 서버 지연 설정")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="이 오류율을 넘으면 한계로 본다")
+    parser.add_argument("--max-p95", type=float, default=10.0, help="턴 p95(초)가 이 값을 넘으면 한계로 본다")
+    parser.add_argument("--keep-going", action="store_true", help="한계에 닿아도 남은 단계를 계속 실행")
+    parser.add_argument("--url", help="이미 떠 있는 앱의 웹소켓 주소 (예: ws://localhost:8501/_stcore/stream). "
+                                      "주면 대역 서버와 앱을 띄우지 않는다")
+    parser.add_argument("--output", help="결과 JSON 파일 (없으면 표준 출력)")
+    args = parser.parse_args()
+    args.ramp = [int(n) for n in args.ramp.split(",") if n.strip()]
+
+    neis = openai = server = sampler = None
+    url = args.url
+    if url is None:
+        neis = start_neis(args.profile, seed=args.seed)
+        openai = start_openai(args.profile, seed=args.seed + 1)
+        port = free_port()
+        env = dict(os.environ,
+                   NEIS_BASE_URL=f"{neis.url}/hub",
+                   NEIS_API_KEY="load",
+                   NEIS_CACHE_PATH=os.path.join(tempfile.mkdtemp(prefix="chatshhs-load-"), "neis_cache.sqlite3"),
+                   NEIS_PREFETCH_INTERVAL="0",
+                   OPENAI_BASE_URL=f"{openai.url}/v1",
+                   OPENAI_API_KEY="load")
+        server = start_app(port, env)
+        sampler = ProcessSampler(server.pid) if os.path.exists(f"/proc/{server.pid}") else None
+        url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    try:
+        stages, breaking_point = asyncio.run(run_ramp(args, url, sampler))
+        round_trips = {"neis": sum(neis.reset_counts().values()), "openai": sum(openai.reset_counts().values())} \
+            if neis else None
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        for stub in (neis, openai):
+            if stub is not None:
+                stub.close()
+
+    result = {
+        "meta": {
+            "ramp": args.ramp,
+            "turns_per_session": args.turns,
+            "think_seconds": args.think,
+            "spawn_seconds": args.spawn,
+            "profile": args.profile if args.url is None else None,
+            "question_mix": QUESTION_MIX,
+            "started": datetime.datetime.now().isoformat(timespec="seconds"),
+        },
+        "stages": stages,
+        "breaking_point": breaking_point,
+        "round_trips": round_trips,
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
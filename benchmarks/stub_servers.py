@@ -0,0 +1,327 @@
+"""벤치마크용 로컬 대역 서버 (OpenAI chat completions, NEIS hub)
+
+실제 서비스 대신 응답 지연을 흉내 내는 HTTP 서버 두 개를 띄웁니다.
+- NEIS: 급식/시간표/학사일정/학교정보/반정보 엔드포인트. 날짜 하나 조회와 기간(_FROM_YMD/_TO_YMD) 조회,
+  페이지(pIndex/pSize)를 실제 응답과 같은 envelope 형식으로 돌려줍니다. 데이터는 날짜로부터 정해지는 고정값.
+- OpenAI: `/v1/chat/completions`. 함수 스키마가 있으면 `intent_router`로 질문을 해석해 function_call을,
+  함수 결과가 오면 그 내용을 요약한 답변을 (stream이면 조각으로 나눠) 돌려줍니다. usage도 채웁니다.
+
+지연은 `LatencyProfile`(기본 + 지터 + 가끔 긴 꼬리)로 정하고, 서버마다 엔드포인트별 왕복 수를 셉니다.
+이 모듈은 `schoolapi`를 가져오지 않으므로, 서버를 띄우고 NEIS_BASE_URL을 정한 뒤에 앱 모듈을 가져오면 됩니다.
+"""
+
+import datetime
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlparse
+
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from date_utils import resolve_query_date  # noqa: E402
+from intent_router import route  # noqa: E402
+from neis_parser import SPECS  # noqa: E402
+
+KST = pytz.timezone('Asia/Seoul')
+
+
+class LatencyProfile(NamedTuple):
+    """응답 지연(초) 분포: base ± jitter, tail_prob 확률로 tail_factor배"""
+    base: float
+    jitter: float = 0.0
+    tail_prob: float = 0.0
+    tail_factor: float = 1.0
+
+    def sample(self, rng):
+        delay = max(0.0, self.base + rng.uniform(-self.jitter, self.jitter))
+        if self.tail_prob and rng.random() < self.tail_prob:
+            delay *= self.tail_factor
+        return delay
+
+
+# 이름별 지연 설정. neis: 요청 하나, llm: 스트리밍이 아닌 응답/첫 조각까지, chunk: 이후 조각 사이
+PROFILES = {
+    "instant": {"neis": LatencyProfile(0.0), "llm": LatencyProfile(0.0), "chunk": LatencyProfile(0.0)},
+    "typical": {"neis": LatencyProfile(0.12, 0.06, 0.02, 5.0), "llm": LatencyProfile(0.6, 0.2, 0.02, 3.0),
+                "chunk": LatencyProfile(0.015, 0.005)},
+    "slow": {"neis": LatencyProfile(0.4, 0.2, 0.05, 5.0), "llm": LatencyProfile(1.5, 0.5, 0.05, 3.0),
+             "chunk": LatencyProfile(0.03, 0.01)},
+}
+
+# 엔드포인트 경로 -> neis_parser 명세 이름
+NEIS_ENDPOINTS = {spec.envelope: name for name, spec in SPECS.items()}
+# 엔드포인트별 (단일 날짜 키, 기간 시작 키, 기간 끝 키)
+DATE_KEYS = {
+    "lunch": ("MLSV_YMD", "MLSV_FROM_YMD", "MLSV_TO_YMD"),
+    "schedule": ("ALL_TI_YMD", "TI_FROM_YMD", "TI_TO_YMD"),
+    "year_sch": ("AA_YMD", "AA_FROM_YMD", "AA_TO_YMD"),
+}
+DISHES = ["잡곡밥", "김치찌개", "제육볶음", "배추김치", "미역국", "닭갈비", "카레라이스", "깍두기", "우동", "과일"]
+SUBJECTS = ["국어", "수학", "영어", "통합과학", "한국사", "체육", "음악", "미술", "정보"]
+EVENTS = {1: "개교기념일", 8: "중간고사", 15: "체육대회", 22: "진로체험", 29: "기말고사"}
+CLASSES_PER_GRADE = 10
+SCHOOL = {
+    "ATPT_OFCDC_SC_CODE": "J10", "ATPT_OFCDC_SC_NM": "경기도교육청", "SD_SCHUL_CODE": "7530081",
+    "SCHUL_NM": "서현고등학교", "ENG_SCHUL_NM": "Seohyeon High School", "SCHUL_KND_SC_NM": "고등학교",
+    "LCTN_SC_NM": "경기도", "FOND_SC_NM": "공립", "ORG_RDNZC": "13591",
+    "ORG_RDNMA": "경기도 성남시 분당구 서현로 100", "ORG_TELNO": "031-000-0000", "HMPG_ADRES": "http://seohyun.hs.kr",
+}
+# schoolInfo 목록 (학교 목록 색인/여러 학교 벤치마크용). 학교가 달라도 급식/시간표 데이터 모양은 같다.
+SCHOOLS = [SCHOOL] + [
+    dict(SCHOOL, ATPT_OFCDC_SC_CODE=office, SD_SCHUL_CODE=code, SCHUL_NM=name, LCTN_SC_NM=region, ORG_RDNMA="")
+    for office, code, name, region in [
+        ("J10", "7530082", "서현중학교", "경기도"),
+        ("J10", "7530100", "분당고등학교", "경기도"),
+        ("B10", "7010001", "서울고등학교", "서울특별시"),
+        ("C10", "7150001", "부산고등학교", "부산광역시"),
+    ]
+]
+
+
+def _dates(start, end):
+    day = datetime.datetime.strptime(start, "%Y%m%d").date()
+    last = datetime.datetime.strptime(end, "%Y%m%d").date()
+    while day <= last:
+        yield day
+        day += datetime.timedelta(days=1)
+
+
+def neis_rows(api_name, params):
+    """요청 파라미터에 맞는 row 리스트 (날짜로부터 정해지는 고정 데이터)"""
+    if api_name == "inform":
+        return [dict(school) for school in SCHOOLS
+                if params.get("SD_SCHUL_CODE") in (None, school["SD_SCHUL_CODE"])
+                and params.get("ATPT_OFCDC_SC_CODE") in (None, school["ATPT_OFCDC_SC_CODE"])]
+    if api_name == "class_info":
+        return [{"GRADE": str(g), "CLASS_NM": str(c)} for g in (1, 2, 3) for c in range(1, CLASSES_PER_GRADE + 1)]
+    single, from_key, to_key = DATE_KEYS[api_name]
+    if params.get(single):
+        days = list(_dates(params[single], params[single]))
+    elif params.get(from_key) and params.get(to_key):
+        days = list(_dates(params[from_key], params[to_key]))
+    else:
+        days = []
+    rows = []
+    for day in days:
+        ymd = day.strftime("%Y%m%d")
+        if api_name == "lunch" and day.weekday() < 5:
+            dishes = [DISHES[(day.toordinal() + i) % len(DISHES)] for i in range(5)]
+            rows.append({"MLSV_YMD": ymd, "MMEAL_SC_NM": "중식", "DDISH_NM": "<br/>".join(dishes),
+                         "CAL_INFO": f"{700 + day.day * 3} Kcal"})
+        elif api_name == "schedule" and day.weekday() < 5:
+            seed = day.toordinal() + int(params.get("GRADE") or 0) * 7 + int(params.get("CLASS_NM") or 0)
+            for period in range(1, 8 if day.weekday() < 4 else 7):
+                rows.append({"ALL_TI_YMD": ymd, "GRADE": params.get("GRADE", ""), "CLASS_NM": params.get("CLASS_NM", ""),
+                             "PERIO": str(period), "ITRT_CNTNT": SUBJECTS[(seed + period) % len(SUBJECTS)]})
+        elif api_name == "year_sch":
+            event = EVENTS.get(day.day, "토요휴업일" if day.weekday() == 5 else None)
+            if event:
+                rows.append({"AA_YMD": ymd, "EVENT_NM": event})
+    return rows
+
+
+def neis_payload(api_name, params):
+    """NEIS와 같은 envelope 형식 응답. 데이터가 없으면 INFO-200"""
+    rows = neis_rows(api_name, params)
+    if not rows:
+        return {"RESULT": {"CODE": "INFO-200", "MESSAGE": "해당하는 데이터가 없습니다."}}
+    size = int(params.get("pSize") or 100)
+    index = int(params.get("pIndex") or 1)
+    page = rows[(index - 1) * size:index * size]
+    if not page:
+        return {"RESULT": {"CODE": "INFO-200", "MESSAGE": "해당하는 데이터가 없습니다."}}
+    return {SPECS[api_name].envelope: [
+        {"head": [{"list_total_count": len(rows)}, {"RESULT": {"CODE": "INFO-000", "MESSAGE": "정상 처리되었습니다."}}]},
+        {"row": page},
+    ]}
+
+
+def _last(messages, role):
+    return next((m for m in reversed(messages) if m.get("role") == role), None)
+
+
+def function_call_for(messages, today):
+    """마지막 질문을 함수 호출 인자로. "그럼 5반은?" 같은 후속 질문은 앞 질문의 인자에 바뀐 부분만 덮어쓴다."""
+    users = [m.get("content") or "" for m in messages if m.get("role") == "user"]
+    if not users:
+        return None
+    args = route(users[-1], today)
+    if args is not None:
+        return args
+    for previous in reversed(users[:-1]):
+        args = route(previous, today)
+        if args is None:
+            continue
+        text = users[-1]
+        if m := re.search(r"(\d+)\s*반", text):
+            args["classnum"] = int(m.group(1))
+        if m := re.search(r"(\d+)\s*학년", text):
+            args["grade"] = int(m.group(1))
+        if (day := resolve_query_date(text, today)) is not None and day != today.strftime("%Y%m%d"):
+            args["date"] = day
+        return args
+    return None
+
+
+def _usage(messages, completion):
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    # 한국어는 대략 글자 1~2개가 토큰 하나
+    return {"prompt_tokens": prompt_chars // 2 + 20, "completion_tokens": len(completion) // 2 + 1,
+            "total_tokens": prompt_chars // 2 + 21 + len(completion) // 2}
+
+
+class StubServer:
+    """ThreadingHTTPServer를 백그라운드 스레드로 돌리고 경로별 왕복 수를 센다."""
+
+    def __init__(self, handler, profile, seed=0, port=0):
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.counts = {}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub = self
+        threading.Thread(target=self.httpd.serve_forever, name=type(self).__name__, daemon=True).start()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self, kind):
+        with self._lock:
+            seconds = self.profile[kind].sample(self.rng)
+        if seconds:
+            time.sleep(seconds)
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def reset_counts(self):
+        with self._lock:
+            out, self.counts = self.counts, {}
+        return out
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _NeisHandler(_Handler):
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        api_name = NEIS_ENDPOINTS.get(endpoint)
+        stub.count(endpoint)
+        stub.delay("neis")
+        if api_name is None:
+            self.send_json(200, {"RESULT": {"CODE": "ERROR-310", "MESSAGE": "해당하는 서비스를 찾을 수 없습니다."}})
+            return
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.send_json(200, neis_payload(api_name, params))
+
+
+class _OpenAIHandler(_Handler):
+    def do_POST(self):
+        stub = self.server.stub
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        messages = body.get("messages") or []
+        today = datetime.datetime.now(KST).date()
+        function = _last(messages, "function")
+        message = {"role": "assistant", "content": None}
+        if body.get("functions") and messages and messages[-1].get("role") == "user":
+            args = function_call_for(messages, today)
+            if args is not None:
+                stub.count("function_call")
+                message["function_call"] = {"name": "get_school_info", "arguments": json.dumps(args, ensure_ascii=False)}
+        if "function_call" not in message:
+            stub.count("answer")
+            if function is not None and messages[-1] is function:
+                result = json.loads(function.get("content") or "{}")
+                lines = result.get("result") or [result.get("error", "정보 없음")]
+                if isinstance(lines, dict):
+                    lines = [f"{k} : {v}" for k, v in lines.items()]
+                message["content"] = "요청하신 정보입니다.\n" + "\n".join(str(line) for line in lines)
+            else:
+                message["content"] = "안녕하세요! 급식, 시간표, 학사일정, 학교 정보를 물어보세요."
+        usage = _usage(messages, message["content"] or message.get("function_call", {}).get("arguments", ""))
+        stub.delay("llm")
+        if body.get("stream"):
+            self.stream(message["content"] or "", usage, (body.get("stream_options") or {}).get("include_usage"))
+            return
+        self.send_json(200, {"id": "stub", "object": "chat.completion", "created": int(time.time()),
+                             "model": body.get("model", "stub"),
+                             "choices": [{"index": 0, "message": message, "finish_reason": "stop"}], "usage": usage})
+
+    def stream(self, text, usage, include_usage):
+        stub = self.server.stub
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(chunk):
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        base = {"id": "stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": "stub"}
+        for i in range(0, len(text), 8):
+            if i:
+                stub.delay("chunk")
+            send({**base, "choices": [{"index": 0, "delta": {"content": text[i:i + 8]}, "finish_reason": None}]})
+        send({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if include_usage:
+            send({**base, "choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+def start_neis(profile="typical", seed=0, port=0):
+    return StubServer(_NeisHandler, PROFILES[profile] if isinstance(profile, str) else profile, seed, port)
+
+
+def start_openai(profile="typical", seed=0, port=0):
+    return StubServer(_OpenAIHandler, PROFILES[profile] if isinstance(profile, str) else profile, seed, port)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="NEIS/OpenAI 대역 서버만 띄웁니다 (Streamlit 앱을 직접 붙여 볼 때).")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical")
+    parser.add_argument("--neis-port", type=int, default=8701)
+    parser.add_argument("--openai-port", type=int, default=8702)
+    args = parser.parse_args()
+    neis = start_neis(args.profile, port=args.neis_port)
+    openai = start_openai(args.profile, port=args.openai_port)
+    print(f"NEIS_BASE_URL={neis.url}/hub")
+    print(f"OPENAI_BASE_URL={openai.url}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,496 @@
+"""ChatSHHS 대화 파이프라인
+
+사용자 질문 하나를 처리하는 흐름(날짜 변환 → 의도 파악/함수 호출 → NEIS 조회 → 최종 답변)을
+담당합니다. 매 턴마다 다시 만들 필요가 없는 것들은 프로세스 전체에서 한 번만 준비합니다.
+- OpenAI 클라이언트: 이벤트 루프마다 하나씩 만들어 연결 풀을 재사용
+- function-calling 스키마: 모듈 상수
+- 시스템 프롬프트: KST 날짜가 바뀔 때만 다시 생성
+
+Streamlit UI(`chatshhs_refactored.py`)는 `get_chat_service().respond(...)`만 호출합니다.
+"""
+
+import asyncio
+import datetime
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+
+import pytz
+from openai import AsyncOpenAI
+
+import schoolapi
+import telemetry
+from answer_cache import data_version, get_answer_cache
+from answer_templates import render_answer
+from context_window import build_context
+from date_utils import convert_relative_date_in_text, normalize_date_token
+from intent_router import question_kind, route, router_stats
+from prefetch import start_scheduler
+from school_fields import FIELD_LABELS, resolve_fields
+from school_registry import DEFAULT_SCHOOL
+from timetable_store import run_query
+
+try:
+    import streamlit as st
+    has_streamlit = True
+except ImportError:
+    has_streamlit = False
+
+# 흔한 질문을 로컬 분류기로 처리해 첫 번째 모델 호출을 건너뛸지 여부
+USE_FAST_PATH = True
+# 빠른 경로로 분류된 질문을 모델 없이 템플릿 답변으로 처리할지 여부 (OpenAI 호출 0회)
+TEMPLATE_ANSWERS = False
+# 빠른 경로 질문의 최종 답변을 (의도, NEIS 데이터 버전) 단위로 세션 사이에 공유할지 여부
+USE_ANSWER_CACHE = True
+# 매 턴 모델에 다시 보낼 지난 대화의 토큰 예산
+CONTEXT_TOKEN_BUDGET = 1500
+MODEL = "gpt-4.1-mini-2025-04-14"
+KST = pytz.timezone('Asia/Seoul')
+WEEKDAY_NAMES = ["월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일"]
+
+def call_school_api(api_name, date=None, grade=None, classnum=None, info_type=None, school=None):
+    """NEIS 오픈 API를 호출합니다.
+
+    실제 호출은 `schoolapi.call_school_api`가 담당합니다. 여러 날짜가 주어지면 연속된 날짜를
+    구간으로 묶어 기간 파라미터(`MLSV_FROM_YMD`/`MLSV_TO_YMD` 등)로 한 번에 조회한 뒤
+    날짜별 응답으로 나눠 돌려줍니다. 응답은 `neis_cache`에 API별 유지 시간만큼 저장되어
+    같은 (학교, API, 날짜, 학년, 반) 조회는 NEIS를 다시 호출하지 않습니다.
+
+    Args:
+        api_name (str): 호출할 API 이름. ("lunch", "schedule", "inform", "year_sch").
+        date (str or list[str], optional): 조회할 날짜(또는 날짜 리스트). 예: "20250614" 또는 ["20250614", "20250615"].
+        grade (int, optional): 시간표 조회 시 학년.
+        classnum (int, optional): 시간표 조회 시 반 번호.
+        info_type (str, optional): 학교 기본정보 조회 시 원하는 필드명.
+        school (School, optional): 조회할 학교. 없으면 `school_registry.DEFAULT_SCHOOL`.
+
+    Returns:
+        dict or str: 성공 시 JSON을 Python dict로 반환합니다. 여러 날짜를 전달하면 날짜별 dict를 반환합니다.
+        오류 발생 시 오류 메시지 문자열을 반환합니다.
+    """
+    return schoolapi.call_school_api(api_name, date=date, grade=grade, classnum=classnum, info_type=info_type,
+                                     school=school)
+
+def extract_school_api_result(api_name, result, date, info_type=None):
+    """`call_school_api`의 응답에서 의미 있는 텍스트 라인을 추출합니다.
+
+    이 함수는 API 응답(JSON 구조)을 받아 사용자가 보기 쉬운 문자열 리스트로 변환합니다.
+
+    Args:
+        api_name (str): 사용한 API 이름.
+        result (dict): `call_school_api`가 반환한 결과(단일 날짜의 dict 또는 날짜->dict 매핑).
+        date (str or list[str]): 조회한 날짜(또는 날짜 리스트).
+        info_type (str, optional): `inform` API 사용 시 원하는 필드명.
+
+    Returns:
+        list[str]: 날짜별로 포맷된 문자열 리스트를 반환합니다. 예: ["20251121 : 급식 ...", ...].
+    """
+    return schoolapi.extract_school_api_result(api_name, result, date, info_type)
+
+def get_school_info(api_name, date=None, grade=None, classnum=None, info_type=None, school=None):
+    """NEIS API를 호출하고 포맷된 결과(문자열 리스트)를 반환합니다.
+
+    Args:
+        api_name (str): 사용할 API 이름.
+        date (str or list[str], optional): 조회할 날짜 또는 날짜 리스트.
+        grade (int, optional): 시간표 조회 시 학년.
+        classnum (int or list[int], optional): 시간표 조회 시 반 번호. 리스트면 반별로 동시에 조회합니다.
+        info_type (str, optional): `inform` API 시 조회할 필드명.
+        school (School, optional): 조회할 학교. 없으면 기본 학교.
+
+    Returns:
+        list[str]: 사용자에게 보여줄 수 있도록 포맷된 결과 라인들의 리스트.
+    """
+    if isinstance(classnum, list):
+        with telemetry.span("neis_fetch", endpoint=api_name, classes=len(classnum)):
+            results = schoolapi.fetch_many([dict(api_name=api_name, date=date, grade=grade, classnum=c, school=school)
+                                            for c in classnum])
+        lines = []
+        with telemetry.span("parse", endpoint=api_name):
+            for c, result in zip(classnum, results):
+                lines += [f"{grade}학년 {c}반 {line}" for line in extract_school_api_result(api_name, result, date, info_type)]
+        return lines
+    with telemetry.span("neis_fetch", endpoint=api_name):
+        result = call_school_api(api_name, date=date, grade=grade, classnum=classnum, info_type=info_type, school=school)
+    with telemetry.span("parse", endpoint=api_name):
+        lines = extract_school_api_result(api_name, result, date, info_type)
+    # 여러 날짜의 결과를 모두 출력하도록 리스트 반환
+    return lines
+
+# 기존 ChatSHHS.py의 AI 챗봇 구조
+
+async def get_school_info_async(api_name, **kwargs):
+    """`get_school_info`의 비동기 버전.
+
+    NEIS 호출(캐시, 공유 세션, 동시 조회 포함)은 작업 스레드에서 실행되어 이벤트 루프를 막지 않습니다.
+    """
+    return await asyncio.to_thread(get_school_info, api_name, **kwargs)
+
+# function-calling 스키마 (매 요청에 같은 내용을 보내므로 한 번만 만든다)
+FUNCTIONS = (
+    {
+        "name": "get_school_info",
+        "description": "NEIS API를 통해 학교 급식/시간표/학사일정/기본정보를 조회합니다.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "api_name": {"type": "string"},
+                "date": {"type": ["string", "array"], "items": {"type": "string"}},
+                "grade": {"type": "integer"},
+                "classnum": {"type": ["integer", "array"], "items": {"type": "integer"}},
+                "info_type": {"type": "string"}
+            },
+            "required": ["api_name"]
+        }
+    },
+    {
+        "name": "query_timetable",
+        "description": "전교 시간표에서 여러 반에 걸친 질문을 조회합니다. "
+                       "classes_with: 그날(그 교시에) 특정 과목이 있는 반, next: 한 반의 다음 특정 과목 수업, "
+                       "compare: 여러 반의 같은 날 시간표 비교.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query_type": {"type": "string", "enum": ["classes_with", "next", "compare"]},
+                "subject": {"type": "string"},
+                "date": {"type": "string"},
+                "period": {"type": "integer"},
+                "grade": {"type": "integer"},
+                "classnum": {"type": "integer"},
+                "classes": {"type": "array", "items": {"type": "string"}, "description": "예: [\"2-5\", \"2-6\"]"}
+            },
+            "required": ["query_type"]
+        }
+    },
+)
+
+SYSTEM_PROMPT_TEMPLATE = '''너는 {school_name} 구성원들을 돕는 유용한 ChatSHHS이야.
+
+**오늘 날짜: {today} ({weekday})**
+
+참고: 사용자가 "다음주 월요일" 같은 상대 날짜를 말하면, 이미 서버에서 절대 날짜(예: 2025년 12월 29일)로 변환되어 전달됩니다.
+
+**API 호출 규칙:**
+1. 사용자 질문에 API 정보가 필요하면 호출
+2. 날짜는 반드시 YYYYMMDD 형식 (예: 20251224)
+3. "12월 25일" 형식은 20251225로 변환
+4. 여러 날짜는 쉼표 구분 (예: lunch, 20251224,20251225)
+
+API 목록:
+- 급식: lunch, [YYYYMMDD]
+- 시간표: schedule, [YYYYMMDD], [학년], [반] (여러 반은 반 번호 리스트)
+- 학사일정: year_sch, [YYYYMMDD]
+- 학교정보: inform (날짜 없음)
+- 여러 반에 걸친 시간표 질문(특정 과목이 있는 반, 다음 수업, 반끼리 비교): query_timetable
+'''
+
+def today_kst():
+    """한국 시간 기준 오늘 날짜"""
+    return datetime.datetime.now(KST).date()
+
+@functools.lru_cache(maxsize=64)
+def system_prompt(today, school_name=DEFAULT_SCHOOL.name):
+    """오늘 날짜와 학교 이름이 들어간 시스템 프롬프트. (날짜, 학교)별로 한 번만 만든다."""
+    return SYSTEM_PROMPT_TEMPLATE.format(today=today.strftime("%Y%m%d"), weekday=WEEKDAY_NAMES[today.weekday()],
+                                         school_name=school_name)
+
+def validate_and_prepare_args(args: dict, today):
+    """모델(또는 빠른 경로)이 만든 함수 인자를 검증하고 `get_school_info` 인자로 정리합니다."""
+    allowed = {"lunch", "schedule", "inform", "year_sch"}
+    api_name = args.get("api_name")
+    if not api_name or api_name not in allowed:
+        raise ValueError(f"허용되지 않는 api_name: {api_name}")
+    out = {"api_name": api_name}
+
+    # inform API는 date를 사용하지 않음
+    if api_name == "inform":
+        if "info_type" in args and args.get("info_type") is not None:
+            info_type = str(args.get("info_type"))
+            # 모델이 "전화번호"처럼 한글 이름을 주면 필드 사전으로 코드를 찾는다.
+            if info_type not in FIELD_LABELS:
+                fields = resolve_fields(info_type)
+                info_type = fields[0] if fields else info_type
+            out["info_type"] = info_type
+        return out
+
+    date = args.get("date")
+    if isinstance(date, list):
+        normalized = [normalize_date_token(d, today) for d in date]
+        if any(n is None for n in normalized):
+            raise ValueError("잘못된 날짜 형식")
+        out["date"] = normalized
+    elif isinstance(date, str):
+        if "," in date:
+            parts = [p.strip() for p in date.split(",") if p.strip()]
+            normalized = [normalize_date_token(p, today) for p in parts]
+            if any(n is None for n in normalized):
+                raise ValueError("잘못된 날짜 형식")
+            out["date"] = normalized
+        else:
+            nd = normalize_date_token(date, today)
+            if nd is None and date is not None:
+                raise ValueError("잘못된 날짜 형식")
+            out["date"] = nd
+    if "grade" in args and args.get("grade") is not None:
+        out["grade"] = int(args.get("grade"))
+    if "classnum" in args and args.get("classnum") is not None:
+        classnum = args.get("classnum")
+        out["classnum"] = [int(c) for c in classnum] if isinstance(classnum, list) else int(classnum)
+    if "info_type" in args and args.get("info_type") is not None:
+        out["info_type"] = str(args.get("info_type"))
+    return out
+
+def load_openai_key():
+    """OpenAI API 키: 우선 st.secrets에서 찾고, 없으면 환경변수 OPENAI_API_KEY 사용"""
+    if has_streamlit:
+        try:
+            return st.secrets.openai.api_key
+        except Exception:
+            pass
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        logging.warning("OpenAI API key not found. Set OPENAI_API_KEY env var or add to .streamlit/secrets.toml")
+    return api_key
+
+class ChatService:
+    """프로세스 전체에서 공유하는 대화 서비스.
+
+    OpenAI 비동기 클라이언트는 연결이 이벤트 루프에 묶이므로 루프마다 하나씩 만들어 재사용합니다.
+    동기 호출(`respond`)은 백그라운드 스레드의 이벤트 루프 하나에서 실행되어, 여러 세션의 요청이
+    같은 루프와 연결 풀 위에서 겹쳐 처리됩니다.
+    """
+
+    def __init__(self, api_key=None):
+        self._api_key = api_key
+        self._clients = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def api_key(self):
+        if self._api_key is None:
+            self._api_key = load_openai_key()
+        return self._api_key
+
+    def client(self):
+        """현재 이벤트 루프용 OpenAI 클라이언트 (처음 한 번만 생성)"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = AsyncOpenAI(api_key=self.api_key)
+            self._clients[loop] = client
+        return client
+
+    def loop(self):
+        """동기 호출용 백그라운드 이벤트 루프"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="chat-service-loop", daemon=True).start()
+            return self._loop
+
+    async def generate_dialogue(self, messages, model=MODEL, max_tokens=150,
+                                temperature=0.7, top_p=1.0, frequency_penalty=0.0, presence_penalty=0.0,
+                                functions=None, function_call="auto", stream=False):
+        kwargs = dict(
+            messages=messages,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            frequency_penalty=frequency_penalty,
+            presence_penalty=presence_penalty,
+        )
+        if functions is not None:
+            kwargs["functions"] = list(functions)
+            kwargs["function_call"] = function_call
+        if stream:
+            kwargs["stream"] = True
+            # 스트리밍 응답도 마지막 조각에 토큰 수를 받는다
+            kwargs["stream_options"] = {"include_usage": True}
+        response = await self.client().chat.completions.create(**kwargs)
+        if not stream:
+            telemetry.record_usage(getattr(response, "usage", None))
+        return response
+
+    async def final_answer(self, messages, on_token=None):
+        """최종 답변을 생성합니다. on_token이 있으면 스트리밍으로 받아 조각이 올 때마다 지금까지의 텍스트를 넘깁니다."""
+        with telemetry.span("second_llm", model=MODEL, stream=on_token is not None) as span:
+            if on_token is None:
+                final = await self.generate_dialogue(messages)
+                return final.choices[0].message.content.strip()
+            started = asyncio.get_running_loop().time()
+            stream = await self.generate_dialogue(messages, stream=True)
+            text = ""
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    telemetry.record_usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if not text:
+                        span.attrs["first_token"] = round(asyncio.get_running_loop().time() - started, 6)
+                    text += chunk.choices[0].delta.content
+                    on_token(text)
+            return text.strip()
+
+    async def respond_async(self, prompt, history=(), on_token=None, turn=None, school=None):
+        """사용자 질문을 받아 OpenAI로부터 응답을 생성하고 필요 시 NEIS API를 호출합니다.
+
+        이 함수는 다음 흐름을 따릅니다:
+        1) 사용자의 질문을 기반으로 모델에게 API 호출 필요 여부를 묻습니다.
+           (흔한 질문은 로컬 분류기가 대신 판단해 이 호출을 건너뜁니다.)
+        2) 함수 호출이 필요하면 NEIS를 조회하고 결과를 모델에 다시 제공해 최종 응답을 생성합니다.
+
+        Args:
+            prompt (str): 사용자의 질문 텍스트.
+            history (list[dict]): 이전 대화 메시지 (`st.session_state.messages`).
+            on_token (callable, optional): 주어지면 함수 호출 이후의 최종 답변을 스트리밍으로 받아
+                토큰이 도착할 때마다 지금까지 누적된 텍스트로 호출합니다.
+            turn (telemetry.Trace, optional): 단계별 소요 시간을 이어서 기록할 턴. 없으면 새로 만듭니다.
+            school (School, optional): 질문 대상 학교. 없으면 `school_registry.DEFAULT_SCHOOL`.
+
+        Returns:
+            str: 최종적으로 사용자에게 보여줄 응답 텍스트.
+        """
+        school = school or DEFAULT_SCHOOL
+        with telemetry.trace(turn, school=school.key):
+            return await self._respond(prompt, history, on_token, school)
+
+    async def _respond(self, prompt, history, on_token, school):
+        logging.info(f"사용자 질문: {prompt}")
+        today = today_kst()
+
+        # 사용자 입력에서 상대 날짜를 절대 날짜로 변환
+        with telemetry.span("date_conversion"):
+            converted_prompt = convert_relative_date_in_text(prompt, today)
+        if converted_prompt != prompt:
+            logging.info(f"날짜 변환됨: {prompt} -> {converted_prompt}")
+
+        history = list(history)
+        # UI가 이번 질문을 이미 기록에 넣었다면 아래에서 변환된 질문으로 다시 붙이므로 뺀다.
+        if history and history[-1] == {"role": "user", "content": prompt}:
+            history.pop()
+        # 토큰 예산 안의 최근 대화만 보내고, 예전 대화는 요약, 지난 함수 결과는 제외
+        messages = build_context({"role": "system", "content": system_prompt(today, school.name)}, history, CONTEXT_TOKEN_BUDGET)
+
+        # 1) 사용자 메시지 전송 (모델에게 function 스키마 포함) - 변환된 프롬프트 사용
+        messages.append({"role": "user", "content": converted_prompt})
+        # 흔한 질문은 로컬 분류기로 함수 인자를 바로 만들어 첫 번째 모델 호출을 건너뜁니다.
+        routed = route(prompt, today) if USE_FAST_PATH else None
+        telemetry.annotate(fast_path=routed is not None)
+        if routed is not None:
+            logging.info(f"빠른 경로 사용: {routed} (적중률 {router_stats()['hit_rate']:.0%})")
+            function_name, raw_args = "get_school_info", routed
+            if TEMPLATE_ANSWERS:
+                # 데이터를 그대로 옮기면 되는 답변은 템플릿으로 만들어 두 번째 모델 호출도 건너뜁니다.
+                query = {k: v for k, v in routed.items() if k != "api_name"}
+                with telemetry.span("neis_fetch", endpoint=routed["api_name"]):
+                    raw = await asyncio.to_thread(call_school_api, routed["api_name"], school=school, **query)
+                with telemetry.span("parse", endpoint=routed["api_name"]):
+                    answer = render_answer(routed["api_name"], raw, question=prompt, **query)
+                if answer:
+                    return answer
+        else:
+            with telemetry.span("first_llm", model=MODEL):
+                dialogue = await self.generate_dialogue(messages, functions=FUNCTIONS, function_call="auto")
+            msg = dialogue.choices[0].message
+            if not (hasattr(msg, "function_call") and msg.function_call):
+                return getattr(msg, 'content', '').strip()
+            function_name = msg.function_call.name if hasattr(msg.function_call, 'name') else 'get_school_info'
+            raw_args = msg.function_call.arguments
+        # 2) 함수 호출 인자를 검증/실행 후 결과를 모델에 전달
+        if function_name == "query_timetable":
+            # 전교 시간표 행렬에서 조회 (반마다 NEIS를 부르지 않음)
+            try:
+                with telemetry.span("validate"):
+                    func_args = json.loads(raw_args) if isinstance(raw_args, str) else raw_args
+                    if func_args.get("date"):
+                        func_args["date"] = normalize_date_token(str(func_args["date"]), today)
+                with telemetry.span("neis_fetch", endpoint="timetable_store"):
+                    api_info = await asyncio.to_thread(run_query, func_args, today, school)
+                content = json.dumps({"result": api_info}, ensure_ascii=False)
+            except Exception as e:
+                content = json.dumps({"error": str(e)}, ensure_ascii=False)
+            messages.append({"role": "function", "name": function_name, "content": content})
+            return await self.final_answer(messages, on_token)
+        try:
+            with telemetry.span("validate"):
+                func_args = json.loads(raw_args) if isinstance(raw_args, str) else raw_args
+                validated = validate_and_prepare_args(func_args, today)
+                api_name = validated.pop("api_name")
+            api_info = await get_school_info_async(api_name, school=school, **validated)
+        except Exception as e:
+            messages.append({"role": "function", "name": function_name, "content": json.dumps({"error": str(e)}, ensure_ascii=False)})
+            return await self.final_answer(messages, on_token)
+        # 빠른 경로 질문은 대화 맥락과 무관하므로, 같은 의도와 같은 NEIS 데이터로 만든 답변을 그대로 쓴다.
+        cache_args = version = None
+        if routed is not None and USE_ANSWER_CACHE and question_kind(prompt, today) == "lookup":
+            # "우유 나와?"처럼 데이터 일부를 묻는 질문은 답이 질문마다 달라 캐시하지 않는다.
+            # 답에 쓰인 "오늘/내일"은 날짜가 바뀌면 틀리므로 오늘 날짜도 키에 넣는다
+            cache_args = dict(validated, api_name=api_name, school=school.key,
+                              question="lookup", today=today.strftime("%Y%m%d"))
+            version = data_version(api_info)
+            cached = get_answer_cache().get(cache_args, version)
+            telemetry.annotate(answer_cache="miss" if cached is None else "hit")
+            if cached is not None:
+                logging.info(f"답변 캐시 사용 (적중률 {get_answer_cache().stats()['hit_rate']:.0%})")
+                if on_token is not None:
+                    on_token(cached)
+                return cached
+        # 함수 실행 결과를 모델에게 전달하고 최종 응답을 요청
+        try:
+            func_result_content = json.dumps({"result": api_info}, ensure_ascii=False)
+        except Exception:
+            func_result_content = str(api_info)
+        messages.append({"role": "function", "name": "get_school_info", "content": func_result_content})
+        answer = await self.final_answer(messages, on_token)
+        if cache_args is not None:
+            get_answer_cache().set(cache_args, version, answer)
+        return answer
+
+    def respond(self, prompt, history=(), on_token=None, school=None):
+        """`respond_async`의 동기 래퍼. 백그라운드 이벤트 루프에서 실행하고 끝날 때까지 기다립니다.
+
+        on_token은 호출한 스레드(Streamlit 스크립트 스레드)에서 실행되도록 큐를 거쳐 전달하고,
+        on_token에 쓴 시간은 이번 턴의 "render" 단계로 기록합니다.
+        """
+        with telemetry.trace() as turn:
+            tokens = queue.Queue() if on_token is not None else None
+            future = asyncio.run_coroutine_threadsafe(
+                self.respond_async(prompt, history, tokens.put if tokens is not None else None, turn, school),
+                self.loop()
+            )
+            if tokens is None:
+                return future.result()
+            rendering, chunks = 0.0, 0
+            while not (future.done() and tokens.empty()):
+                try:
+                    text = tokens.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+                started = time.perf_counter()
+                on_token(text)
+                rendering += time.perf_counter() - started
+                chunks += 1
+            telemetry.record_span("render", rendering, chunks=chunks)
+            return future.result()
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_chat_service():
+    """프로세스 전체에서 공유하는 대화 서비스 (처음 호출할 때 생성)"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = ChatService()
+                # NEIS_PREFETCH_INTERVAL이 설정되어 있으면 캐시 미리 채우기 스레드도 같이 시작
+                start_scheduler()
+                # TELEMETRY_PORT가 설정되어 있으면 단계별 지표를 /metrics로 제공
+                telemetry.start_metrics_server()
+    return _service
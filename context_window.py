@@ -0,0 +1,84 @@
+"""대화 맥락 창 관리
+
+매 턴 전체 대화를 모델에 다시 보내면 대화가 길어질수록 프롬프트가 끝없이 커집니다.
+`build_context`는 토큰 예산 안에 들어가는 최근 대화만 남기고, 잘려 나간 예전 대화는
+사용자 질문 위주의 짧은 요약 한 줄로 대신합니다. 지난 턴의 함수 호출 결과(NEIS 데이터)는
+다시 보내지 않습니다.
+"""
+
+import re
+
+# 시스템 프롬프트와 이번 질문을 제외한 대화 기록에 쓸 토큰 예산
+DEFAULT_TOKEN_BUDGET = 1500
+# 메시지 하나당 역할/구분자 등에 붙는 고정 비용
+MESSAGE_OVERHEAD = 4
+# 요약에 남길 예전 질문의 최대 개수와 질문당 최대 글자 수
+SUMMARY_MAX_QUESTIONS = 5
+SUMMARY_QUESTION_CHARS = 40
+
+_HANGUL = re.compile(r"[가-힣ㄱ-ㆎ]")
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def estimate_tokens(text):
+    """토크나이저 없이 대략적인 토큰 수를 계산합니다.
+
+    한글 음절은 1토큰 안팎, 영문/숫자/기호는 약 4글자에 1토큰으로 봅니다.
+    """
+    if not text:
+        return 0
+    text = str(text)
+    hangul = len(_HANGUL.findall(text))
+    other_non_ascii = len(_NON_ASCII.findall(text)) - hangul
+    ascii_chars = len(text) - hangul - other_non_ascii
+    return hangul + other_non_ascii + (ascii_chars + 3) // 4
+
+
+def message_tokens(message):
+    return MESSAGE_OVERHEAD + estimate_tokens(message.get("content"))
+
+
+def summarize(dropped):
+    """잘려 나간 대화를 질문 목록 한 줄로 요약"""
+    questions = [m.get("content", "") for m in dropped if m.get("role") == "user" and m.get("content")]
+    if not questions:
+        return None
+    recent = questions[-SUMMARY_MAX_QUESTIONS:]
+    recent = [q if len(q) <= SUMMARY_QUESTION_CHARS else q[:SUMMARY_QUESTION_CHARS] + "…" for q in recent]
+    return {"role": "system", "content": "이전 대화 요약 - 사용자가 앞서 물어본 것: " + " / ".join(recent)}
+
+
+def build_context(system_message, history, budget=DEFAULT_TOKEN_BUDGET):
+    """시스템 메시지 + (요약) + 예산 안의 최근 대화 메시지 리스트를 만듭니다.
+
+    Args:
+        system_message (dict): 맨 앞에 둘 시스템 메시지.
+        history (list[dict]): 지난 대화 (`st.session_state.messages`).
+        budget (int): 대화 기록에 쓸 토큰 예산. 요약 메시지도 이 안에 포함됩니다.
+
+    Returns:
+        list[dict]: 모델에 보낼 메시지 리스트 (이번 질문은 호출하는 쪽에서 붙입니다).
+    """
+    # 지난 턴의 함수 결과는 이미 답변에 반영되어 있으므로 다시 보내지 않는다.
+    turns = [m for m in history if m.get("role") in ("user", "assistant") and m.get("content")]
+    kept = []
+    used = 0
+    for message in reversed(turns):
+        cost = message_tokens(message)
+        if used + cost > budget:
+            break
+        kept.append(message)
+        used += cost
+    kept.reverse()
+    # 잘린 대화가 있으면 요약을 붙이고, 요약이 들어갈 자리가 없으면 가장 오래된 메시지부터 더 뺀다.
+    while True:
+        summary = summarize(turns[:len(turns) - len(kept)])
+        if summary is None or used + message_tokens(summary) <= budget:
+            break
+        if not kept:
+            summary = None
+            break
+        used -= message_tokens(kept.pop(0))
+    if summary is not None:
+        kept.insert(0, summary)
+    return [system_message] + [{"role": m["role"], "content": m["content"]} for m in kept]
@@ -0,0 +1,173 @@
+"""날짜 관련 유틸리티
+
+사용자 입력의 상대 날짜("내일", "다음주 월요일")를 절대 날짜로 바꾸고,
+모델이나 사용자가 준 여러 형식의 날짜를 YYYYMMDD로 정규화합니다.
+"""
+
+import datetime
+import re
+
+
+# 한 번의 스캔으로 모든 날짜 표현을 찾는 정규식. 앞에 있는 대안이 우선하므로 긴 표현을 먼저 둔다.
+RELATIVE_DATE_PATTERN = re.compile(
+    r"(?P<week>(?P<week_word>다다음|다음|이번|지난|저번)\s*주\s*(?P<week_day>[월화수목금토일])요일)"
+    r"|(?P<month_end>(?P<month_word>이번|다음)\s*달\s*(?:말|마지막\s*날))"
+    r"|(?P<absolute>(?:(?P<abs_y>\d{4})년\s*)?(?P<abs_m>\d{1,2})월\s*(?P<abs_d>\d{1,2})일)"
+    r"|(?P<iso>(?<!\d)(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})(?!\d))"
+    r"|(?P<compact>(?<!\d)(?P<compact_ymd>20\d{6})(?!\d))"
+    r"|(?P<offset>(?<!\d)(?P<offset_n>\d{1,3})\s*일\s*(?P<offset_dir>후|뒤|전))"
+    r"|(?P<slash>(?<![\d/])(?P<slash_m>\d{1,2})/(?P<slash_d>\d{1,2})(?![\d/]))"
+    r"|(?P<day_word>그저께|오늘|내일|모레|글피|어제|그제)"
+    r"|(?P<weekday>(?<![가-힣])(?P<weekday_day>[월화수목금토일])요일)"
+)
+WEEKDAY_INDEX = {"월": 0, "화": 1, "수": 2, "목": 3, "금": 4, "토": 5, "일": 6}
+DAY_WORD_OFFSETS = {"그저께": -2, "그제": -2, "어제": -1, "오늘": 0, "내일": 1, "모레": 2, "글피": 3}
+WEEK_WORD_OFFSETS = {"지난": -7, "저번": -7, "이번": 0, "다음": 7, "다다음": 14}
+# 본문에 다시 써 넣을 때의 형식 (모델이 읽기 쉬운 형태)
+DISPLAY_FORMAT = '%Y년 %m월 %d일'
+# 날짜를 말한 것 같지만 위 규칙으로 풀리지 않은 표현 ("15일", "금요일쯤", "다음 달" 등)
+VAGUE_DATE_TERMS = re.compile(r"\d+\s*(?:일|월|주)|요일|주말|주간|(?:이번|다음|지난|저번|다다음|몇)\s*(?:주|달)|월말|월초")
+
+
+def _week_start(today_kst):
+    """한국식 주 구분(일요일 시작)에서 이번 주 일요일"""
+    return today_kst - datetime.timedelta(days=(today_kst.weekday() + 1) % 7)
+
+
+def _safe_date(year, month, day):
+    try:
+        return datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _resolve_match(m, today_kst):
+    """매치 하나를 (날짜, 본문 치환 여부)로 해석. 해석할 수 없으면 (None, False)"""
+    kind = m.lastgroup
+    if kind == "week":
+        start = _week_start(today_kst) + datetime.timedelta(days=WEEK_WORD_OFFSETS[m.group("week_word")])
+        return start + datetime.timedelta(days=(WEEKDAY_INDEX[m.group("week_day")] + 1) % 7), True
+    if kind == "month_end":
+        year, month = today_kst.year, today_kst.month
+        if m.group("month_word") == "다음":
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        next_first = datetime.date(year + 1, 1, 1) if month == 12 else datetime.date(year, month + 1, 1)
+        return next_first - datetime.timedelta(days=1), True
+    if kind == "absolute":
+        return _safe_date(m.group("abs_y") or today_kst.year, m.group("abs_m"), m.group("abs_d")), False
+    if kind == "iso":
+        return _safe_date(m.group("iso_y"), m.group("iso_m"), m.group("iso_d")), False
+    if kind == "compact":
+        ymd = m.group("compact_ymd")
+        return _safe_date(ymd[:4], ymd[4:6], ymd[6:]), False
+    if kind == "offset":
+        days = int(m.group("offset_n"))
+        return today_kst + datetime.timedelta(days=-days if m.group("offset_dir") == "전" else days), True
+    if kind == "slash":
+        return _safe_date(today_kst.year, m.group("slash_m"), m.group("slash_d")), True
+    if kind == "day_word":
+        return today_kst + datetime.timedelta(days=DAY_WORD_OFFSETS[m.group("day_word")]), True
+    if kind == "weekday":
+        # 요일만 말하면 오늘을 포함해 가장 가까운 그 요일
+        return today_kst + datetime.timedelta(days=(WEEKDAY_INDEX[m.group("weekday_day")] - today_kst.weekday()) % 7), True
+    return None, False
+
+
+def resolve_relative_dates(text, today_kst):
+    """문장을 한 번 훑어 상대 날짜를 절대 날짜로 바꾸고, 언급된 날짜를 YYYYMMDD 리스트로 함께 반환합니다.
+
+    "내일", "다다음주 화요일", "이번달 말", "3일 후", "금요일", "12/25" 같은 표현은
+    "2025년 12월 25일" 형식으로 치환하고, 이미 절대 날짜인 표현은 그대로 두고 날짜만 수집합니다.
+
+    Returns:
+        tuple[str, list[str]]: (변환된 문장, 등장 순서대로 중복 없는 YYYYMMDD 리스트)
+    """
+    dates = []
+
+    def replace(m):
+        day, rewrite = _resolve_match(m, today_kst)
+        if day is None:
+            return m.group(0)
+        ymd = day.strftime("%Y%m%d")
+        if ymd not in dates:
+            dates.append(ymd)
+        return day.strftime(DISPLAY_FORMAT) if rewrite else m.group(0)
+
+    return RELATIVE_DATE_PATTERN.sub(replace, text), dates
+
+
+def convert_relative_date_in_text(text, today_kst):
+    """사용자 입력에서 상대 날짜 표현을 절대 날짜("2025년 12월 25일")로 변환합니다."""
+    return resolve_relative_dates(text, today_kst)[0]
+
+
+def normalize_date_token(tok, today_kst):
+    """다양한 날짜 형식을 YYYYMMDD로 정규화합니다."""
+    tok = str(tok).strip()
+
+    # 이미 YYYYMMDD 형식인 경우
+    if re.match(r"^\d{8}$", tok):
+        try:
+            datetime.datetime.strptime(tok, "%Y%m%d")
+            return tok
+        except ValueError:
+            return None
+
+    # YYYY-MM-DD 형식
+    m = re.match(r"^(\d{4})-(\d{2})-(\d{2})$", tok)
+    if m:
+        try:
+            datetime.datetime.strptime(f"{m.group(1)}{m.group(2)}{m.group(3)}", "%Y%m%d")
+            return f"{m.group(1)}{m.group(2)}{m.group(3)}"
+        except ValueError:
+            return None
+
+    # MM-DD 형식 (올해로 자동 설정)
+    m = re.match(r"^(\d{1,2})-(\d{1,2})$", tok)
+    if m:
+        try:
+            year = today_kst.year
+            month = m.group(1).zfill(2)
+            day = m.group(2).zfill(2)
+            datetime.datetime.strptime(f"{year}{month}{day}", "%Y%m%d")
+            return f"{year}{month}{day}"
+        except ValueError:
+            return None
+
+    return None
+
+
+def week_dates(week_start, weekdays_only=True):
+    """일요일로 시작하는 한 주의 날짜를 YYYYMMDD 리스트로 반환합니다. 기본은 월~금만."""
+    days = range(1, 6) if weekdays_only else range(7)
+    return [(week_start + datetime.timedelta(days=i)).strftime("%Y%m%d") for i in days]
+
+
+def extract_dates(text, today_kst):
+    """문장에서 날짜를 찾아 YYYYMMDD 리스트로 반환합니다.
+
+    `resolve_relative_dates`가 찾은 날짜가 없으면 "이번주"/"다음주"/"다다음주"를 그 주의 월~금으로 봅니다.
+    """
+    found = resolve_relative_dates(text, today_kst)[1]
+    if found:
+        return found
+    m = re.search(r"(다다음|다음|이번|지난|저번)\s*주", text)
+    if m:
+        return week_dates(_week_start(today_kst) + datetime.timedelta(days=WEEK_WORD_OFFSETS[m.group(1)]))
+    return []
+
+
+def resolve_query_date(text, today_kst):
+    """질문에 필요한 날짜 하나를 YYYYMMDD로 구합니다.
+
+    날짜 언급이 없으면 오늘을, 날짜를 말한 것 같은데 규칙으로 풀 수 없으면 None을 반환합니다.
+    (None이면 호출하는 쪽에서 모델에게 물어봅니다.)
+    """
+    converted, dates = resolve_relative_dates(text, today_kst)
+    if not dates:
+        dates = extract_dates(converted, today_kst)
+    if dates:
+        return dates[0]
+    if VAGUE_DATE_TERMS.search(converted):
+        return None
+    return today_kst.strftime("%Y%m%d")
@@ -0,0 +1,110 @@
+"""규칙 기반 의도 분류기
+
+"내일 급식 뭐야?", "2학년 6반 시간표"처럼 흔한 질문은 모델에게 어떤 함수를 부를지
+물어볼 필요 없이 바로 `get_school_info` 인자를 만들 수 있습니다. `route`가 분류에 성공하면
+첫 번째 LLM 호출을 건너뛰고, 애매한 질문(여러 의도, 대화 맥락이 필요한 후속 질문 등)은
+None을 반환해 기존대로 모델에게 맡깁니다.
+"""
+
+import re
+import threading
+
+from date_utils import VAGUE_DATE_TERMS, extract_dates, resolve_relative_dates
+from school_fields import resolve_fields
+
+# 의도별 키워드. 둘 이상의 의도에 걸리면 모델에게 넘긴다.
+INTENT_PATTERNS = {
+    "lunch": re.compile(r"급식|점심|중식|석식|조식|식단|메뉴"),
+    "schedule": re.compile(r"시간표|교시"),
+    "year_sch": re.compile(r"학사\s*일정|일정|행사|방학|개학|시험|휴업"),
+    "inform": re.compile(r"주소|전화\s*번호|연락처|팩스|홈페이지|개교\s*기념일|설립\s*(?:일|[연년]도)|학교\s*이름|학교명|영문\s*이름|남녀\s*공학"),
+}
+
+# 이전 대화에 기대는 후속 질문은 맥락을 아는 모델에게 맡긴다.
+FOLLOW_UP = re.compile(r"^\s*(그럼|그러면|그건|그거|거기|아까|방금|다시|그리고)")
+# 중식이 아닌 끼니를 묻는 질문. 빠른 경로의 급식 인자에는 끼니 구분이 없으므로 모델에게 넘긴다.
+OTHER_MEALS = re.compile(r"석식|조식|저녁|아침")
+GRADE_CLASS = re.compile(r"([1-3])\s*학년\s*(\d{1,2})\s*반|(?<!\d)([1-3])\s*-\s*(\d{1,2})(?!\d)")
+# 데이터를 그대로 보여 달라는 질문에 흔히 붙는 말. 날짜/학년·반/의도 표현 말고 이것만 있으면 "lookup" 질문이다.
+LOOKUP_WORDS = re.compile(
+    r"\d+\s*(?:년|월|일)|[월화수목금토일]요일|알려\s*주세요|알려\s*줘|알려|보여\s*줘|가르쳐\s*줘|"
+    r"뭐야|뭐예요|뭐에요|뭔데|뭐지|뭔지|뭐|무엇|어때|언제야|언제|어디야|어디|나와|나오니|있어|우리|저희|학교|혹시|좀"
+)
+_LOOKUP_PATTERN = re.compile("|".join(p.pattern for p in INTENT_PATTERNS.values()) + "|" + LOOKUP_WORDS.pattern)
+_WORD = re.compile(r"[가-힣A-Za-z0-9]+")
+_PARTICLE = re.compile(r"(은|는|이|가|을|를|에|에서|의|도|요|에요|예요|이야|야)$")
+
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(hit):
+    with _stats_lock:
+        _stats["hits" if hit else "misses"] += 1
+
+
+def router_stats():
+    """분류 성공/실패 횟수와 적중률"""
+    with _stats_lock:
+        out = dict(_stats)
+    total = out["hits"] + out["misses"]
+    out["hit_rate"] = out["hits"] / total if total else 0.0
+    return out
+
+
+def classify(text, today_kst):
+    """질문을 `get_school_info` 인자 dict로 바꿉니다. 확실하지 않으면 None."""
+    if FOLLOW_UP.search(text):
+        return None
+    intents = [name for name, pattern in INTENT_PATTERNS.items() if pattern.search(text)]
+    # "시험 기간 시간표"처럼 시간표와 일정이 같이 나오면 시간표로 본다.
+    if set(intents) == {"schedule", "year_sch"}:
+        intents = ["schedule"]
+    if len(intents) != 1:
+        return None
+    api_name = intents[0]
+    if api_name == "lunch" and OTHER_MEALS.search(text):
+        return None
+    if api_name == "inform":
+        # 빠른 경로에서는 오답을 피하려고 사전에 있는 표현만 쓴다.
+        fields = resolve_fields(text, fuzzy=False)
+        if len(fields) != 1:
+            return None
+        return {"api_name": "inform", "info_type": fields[0]}
+
+    converted, dates = resolve_relative_dates(text, today_kst)
+    if not dates:
+        dates = extract_dates(converted, today_kst)
+    if not dates:
+        # 날짜 언급이 없는 급식/시간표 질문은 오늘로 본다. 학사일정은 범위가 모호하므로 모델에게 넘긴다.
+        if api_name == "year_sch" or VAGUE_DATE_TERMS.search(converted):
+            return None
+        dates = [today_kst.strftime("%Y%m%d")]
+    args = {"api_name": api_name, "date": dates[0] if len(dates) == 1 else dates}
+    if api_name == "schedule":
+        m = GRADE_CLASS.search(converted)
+        if not m:
+            return None
+        args["grade"] = int(m.group(1) or m.group(3))
+        args["classnum"] = int(m.group(2) or m.group(4))
+    return args
+
+
+def question_kind(text, today_kst):
+    """질문 종류. 조회한 데이터를 그대로 보여 주면 되는 질문("오늘 급식 뭐야", "급식 알려줘")은 "lookup",
+    그 밖의 말이 남는 질문("내일 급식에 우유 나와?", "2학년 6반 3교시 뭐야")은 "specific".
+
+    같은 인자로 조회해도 "specific" 질문은 답이 질문마다 다르다.
+    """
+    converted, _ = resolve_relative_dates(text, today_kst)
+    rest = _LOOKUP_PATTERN.sub(" ", GRADE_CLASS.sub(" ", converted))
+    if any(_PARTICLE.sub("", word) for word in _WORD.findall(rest)):
+        return "specific"
+    return "lookup"
+
+
+def route(text, today_kst):
+    """`classify`와 같지만 적중률 통계를 남깁니다."""
+    args = classify(text, today_kst)
+    _count(args is not None)
+    return args
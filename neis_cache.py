@@ -0,0 +1,209 @@
+"""NEIS 응답 캐시
+
+(school, api_name, date, grade, classnum) 단위로 NEIS 응답 JSON을 저장한다.
+프로세스 메모리의 LRU 캐시를 먼저 보고, 없으면 SQLite 파일을 본다.
+메모리 LRU는 학교별로 나눠 두고(학교마다 max_school_items개까지) 전체는 max_items개를 넘지 않는다.
+전체가 넘치면 가장 오래 쓰지 않은 학교의 항목부터 밀어내므로, 바쁜 학교 하나가 다른 학교의 캐시를
+모두 밀어내지 않고 학교 수가 늘어도 메모리는 늘지 않는다.
+SQLite 읽기/쓰기는 메모리 LRU와 다른 잠금에서 하므로 디스크 쓰기 중에도 메모리 적중은 기다리지 않는다.
+기간 조회처럼 여러 항목을 한꺼번에 넣을 때는 `set_many`로 한 번에 commit한다.
+SQLite 파일은 Streamlit 재실행이나 프로세스 재시작 후에도 그대로 남는다.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# API별 캐시 유지 시간(초)
+DEFAULT_TTLS = {
+    "lunch": 12 * 60 * 60,
+    "schedule": 6 * 60 * 60,
+    "year_sch": 24 * 60 * 60,
+    "inform": 7 * 24 * 60 * 60
+}
+# "해당하는 데이터가 없습니다"(INFO-200) 응답은 나중에 등록될 수 있으므로 짧게 유지
+NO_DATA_TTL = 60 * 60
+DEFAULT_MAX_ITEMS = 512
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".neis_cache.sqlite3")
+
+
+def make_key(api_name, date=None, grade=None, classnum=None, school=None):
+    """캐시 키 문자열. school은 학교 키(행정표준코드), None은 빈 문자열로 취급"""
+    parts = [school, api_name, date, grade, classnum]
+    return "|".join("" if p is None else str(p) for p in parts)
+
+
+def is_no_data(value):
+    return isinstance(value, dict) and value.get("RESULT", {}).get("CODE") == "INFO-200"
+
+
+class NeisCache:
+    """메모리 LRU + SQLite 2단 캐시. 여러 스레드에서 같이 써도 된다."""
+
+    def __init__(self, path=DEFAULT_PATH, max_items=DEFAULT_MAX_ITEMS, ttls=None, max_school_items=None):
+        self.path = path
+        self.max_items = max_items
+        self.max_school_items = max_school_items or max_items
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        # 학교 키 -> OrderedDict. 바깥 순서도 학교를 마지막으로 쓴 순서(LRU)
+        self._memory = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()  # 메모리 LRU와 카운터
+        self._disk_lock = threading.Lock()  # SQLite 연결
+        self._conn = None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+        if path:
+            try:
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS neis_cache ("
+                    "key TEXT PRIMARY KEY, api_name TEXT, value TEXT, expires_at REAL, school TEXT)"
+                )
+                columns = [row[1] for row in self._conn.execute("PRAGMA table_info(neis_cache)")]
+                if "school" not in columns:
+                    # 학교 구분이 없던 이전 캐시 파일: 이전 항목은 키 모양이 달라 읽히지 않고 만료되면 지워진다
+                    self._conn.execute("ALTER TABLE neis_cache ADD COLUMN school TEXT")
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"NEIS 디스크 캐시를 열 수 없어 메모리 캐시만 사용합니다: {e}")
+                self._conn = None
+
+    def ttl_for(self, api_name, value):
+        if is_no_data(value):
+            return min(NO_DATA_TTL, self.ttls.get(api_name, NO_DATA_TTL))
+        return self.ttls.get(api_name, 0)
+
+    def get(self, api_name, date=None, grade=None, classnum=None, school=None):
+        """캐시된 응답을 반환. 없거나 만료됐으면 None"""
+        key = make_key(api_name, date, grade, classnum, school)
+        now = time.time()
+        with self._lock:
+            memory = self._memory.get(school or "")
+            entry = memory.get(key) if memory is not None else None
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    memory.move_to_end(key)
+                    self._memory.move_to_end(school or "")
+                    self.counters["memory_hits"] += 1
+                    return value
+                del memory[key]
+                self._size -= 1
+        row = None
+        if self._conn is not None:
+            with self._disk_lock:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM neis_cache WHERE key = ?", (key,)
+                ).fetchone()
+        with self._lock:
+            if row is not None and row[1] > now:
+                value = json.loads(row[0])
+                self._remember(school, key, row[1], value)
+                self.counters["disk_hits"] += 1
+                return value
+            self.counters["misses"] += 1
+            return None
+
+    def set(self, api_name, date, grade, classnum, value, school=None):
+        """응답을 저장. dict가 아닌 값(오류 메시지 등)은 저장하지 않는다."""
+        self.set_many([(api_name, date, grade, classnum, value)], school)
+
+    def set_many(self, entries, school=None):
+        """(api_name, date, grade, classnum, value) 여러 개를 저장하고 디스크에는 한 번만 commit한다."""
+        now = time.time()
+        rows = []
+        for api_name, date, grade, classnum, value in entries:
+            if not isinstance(value, dict):
+                continue
+            ttl = self.ttl_for(api_name, value)
+            if ttl > 0:
+                rows.append((make_key(api_name, date, grade, classnum, school), api_name, value, now + ttl))
+        if not rows:
+            return
+        with self._lock:
+            for key, _, value, expires_at in rows:
+                self._remember(school, key, expires_at, value)
+            self.counters["writes"] += len(rows)
+        if self._conn is not None:
+            encoded = [(key, api_name, json.dumps(value, ensure_ascii=False), expires_at, school or "")
+                       for key, api_name, value, expires_at in rows]
+            with self._disk_lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO neis_cache (key, api_name, value, expires_at, school) VALUES (?, ?, ?, ?, ?)",
+                    encoded
+                )
+                self._conn.commit()
+
+    def _remember(self, school, key, expires_at, value):
+        school = school or ""
+        memory = self._memory.setdefault(school, OrderedDict())
+        self._memory.move_to_end(school)
+        if key not in memory:
+            self._size += 1
+        memory[key] = (expires_at, value)
+        memory.move_to_end(key)
+        if len(memory) > self.max_school_items:
+            memory.popitem(last=False)
+            self._size -= 1
+        # 전체 한도: 가장 오래 쓰지 않은 학교의 가장 오래된 항목부터
+        while self._size > self.max_items:
+            oldest_school, oldest = next(iter(self._memory.items()))
+            oldest.popitem(last=False)
+            self._size -= 1
+            if not oldest:
+                del self._memory[oldest_school]
+
+    def purge_expired(self):
+        """만료된 항목을 디스크에서 지운다."""
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM neis_cache WHERE expires_at <= ?", (time.time(),))
+                self._conn.commit()
+
+    def clear(self, school=None):
+        """전체(또는 school 학교의) 캐시를 지운다."""
+        with self._lock, self._disk_lock:
+            if school is None:
+                self._memory.clear()
+                self._size = 0
+            else:
+                self._size -= len(self._memory.pop(school, ()))
+            if self._conn is not None:
+                if school is None:
+                    self._conn.execute("DELETE FROM neis_cache")
+                else:
+                    self._conn.execute("DELETE FROM neis_cache WHERE school = ?", (school,))
+                self._conn.commit()
+
+    def stats(self):
+        """적중/미스 횟수와 적중률"""
+        with self._lock:
+            out = dict(self.counters)
+            out["memory_items"] = self._size
+            out["schools"] = len(self._memory)
+        hits = out["memory_hits"] + out["disk_hits"]
+        total = hits + out["misses"]
+        out["hits"] = hits
+        out["hit_rate"] = hits / total if total else 0.0
+        return out
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """프로세스 전체에서 공유하는 캐시. 경로는 NEIS_CACHE_PATH 환경변수로 바꿀 수 있고 빈 값이면 디스크를 쓰지 않는다."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = NeisCache(path=os.getenv("NEIS_CACHE_PATH", DEFAULT_PATH))
+                _cache.purge_expired()
+    return _cache
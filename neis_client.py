@@ -0,0 +1,205 @@
+"""NEIS HTTP 클라이언트
+
+프로세스 전체에서 하나의 `requests.Session`을 공유해 keep-alive 연결을 재사용한다.
+모든 요청에 연결/읽기 타임아웃을 걸고, 5xx 응답과 연결 오류는 지터를 섞은 지수 백오프로
+몇 번 재시도한다. 연속 실패가 쌓이면 회로 차단기가 열려 일정 시간 동안 바로 실패시킨다.
+같은 URL/파라미터 요청이 동시에 여러 개 들어오면 하나만 보내고 나머지는 그 결과를 나눠 받는다(single-flight).
+학교별 호출 한도(quota)는 실제로 요청을 보내는 쪽에서만 쓰므로, 결과를 나눠 받은 요청은 한도를 쓰지 않는다.
+"""
+
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.3
+BACKOFF_MAX = 3.0
+POOL_SIZE = 20
+# 연속 실패 몇 번이면 차단기를 열지, 열린 뒤 몇 초 후에 다시 시도할지
+BREAKER_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30
+# 재시도할 만한 일시적 오류 (연결 끊김, 타임아웃, 응답 본문이 중간에 끊김)
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.ContentDecodingError)
+
+
+class NeisUnavailable(Exception):
+    """회로 차단기가 열려 있어 요청을 보내지 않았을 때"""
+
+
+class QuotaExceeded(Exception):
+    """학교별 NEIS 호출 한도를 넘어 요청을 보내지 않았을 때"""
+
+
+class CircuitBreaker:
+    """연속 실패 횟수로 열리고, 일정 시간이 지나면 요청 하나만 시험 삼아 통과시킨다."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_seconds or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def end_trial(self):
+        """시험 요청이 성공/실패 기록 없이 끝났을 때도 다음 시험 요청을 막지 않도록 표시를 지운다."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logging.warning("NEIS 연속 실패로 회로 차단기를 엽니다.")
+                self.opened_at = time.monotonic()
+
+
+class _Flight:
+    """진행 중인 요청 하나. 같은 요청을 기다리는 스레드들이 결과(또는 예외)를 나눠 받는다."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class NeisClient:
+    """NEIS 호출 전용 클라이언트. 여러 스레드에서 하나의 인스턴스를 같이 쓴다."""
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, pool_size=POOL_SIZE, breaker=None, single_flight=True):
+        self.timeout = (connect_timeout, read_timeout)
+        self.single_flight = single_flight
+        self.coalesced = 0
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt):
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(0, delay)
+
+    def get_json(self, url, params, school_key=None, quota=None):
+        """GET 요청 후 JSON을 반환. 재시도 후에도 실패하면 마지막 예외를 raise
+
+        같은 요청이 이미 진행 중이면 새로 보내지 않고 그 결과를 기다렸다가 같이 반환한다.
+        반환된 dict는 여러 호출자가 공유하므로 수정하지 않는다.
+        quota(`school_registry.SchoolQuota`)가 있으면 실제로 보내는 요청만 school_key의 한도를 하나 쓰고,
+        한도를 넘으면 보내지 않고 `QuotaExceeded`를 raise한다. 결과를 기다린 요청은 한도를 쓰지 않는다.
+        """
+        if not self.single_flight:
+            return self._fetch(url, params, school_key, quota)
+        key = (url, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = self._fetch(url, params, school_key, quota)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def _fetch(self, url, params, school_key=None, quota=None):
+        if school_key and quota is not None and not quota.acquire(school_key):
+            raise QuotaExceeded("이 학교의 NEIS 호출 한도를 넘었습니다. 잠시 후 다시 시도해주세요.")
+        if not self.breaker.allow():
+            raise NeisUnavailable("NEIS 서버 응답이 불안정해 잠시 요청을 중단했습니다.")
+        try:
+            return self._attempt(url, params)
+        finally:
+            self.breaker.end_trial()
+
+    def _attempt(self, url, params):
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self._backoff(attempt - 1))
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                continue
+            except requests.RequestException:
+                # 리다이렉트 반복, 잘못된 주소 등은 재시도해도 같으므로 실패로 기록하고 바로 raise
+                self.breaker.record_failure()
+                raise
+            if response.status_code >= 500:
+                last_error = requests.HTTPError(f"{response.status_code} Server Error", response=response)
+                continue
+            try:
+                response.raise_for_status()
+                data = response.json()
+            except Exception:
+                # 4xx나 잘못된 JSON은 재시도해도 같으므로 바로 실패. 서버는 살아 있으므로 차단기에는 성공으로 기록
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            return data
+        self.breaker.record_failure()
+        raise last_error
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """프로세스 전체에서 공유하는 NEIS 클라이언트"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = NeisClient()
+    return _client
@@ -0,0 +1,200 @@
+"""NEIS 응답 파서
+
+엔드포인트마다 (응답 최상위 키, row의 날짜 필드, row -> 레코드 변환)을 표로 선언해 두고,
+NEIS JSON 응답을 한 번 훑어 가벼운 NamedTuple 레코드 리스트로 바꿉니다.
+문자열로 꾸미는 일은 화면/모델에 넘기기 직전(`format_lines` 등)에서만 합니다.
+
+단일 날짜 응답, `call_school_api`의 날짜별 dict, 기간 조회로 모은 row 리스트를 모두 같은 방식으로 다룹니다.
+"""
+
+from typing import NamedTuple, Callable, Optional
+
+
+class Meal(NamedTuple):
+    date: str
+    meal_name: str  # 조식/중식/석식
+    dishes: str  # DDISH_NM 원문 ("<br/>"로 구분, 알레르기 번호 포함)
+    calories: str
+
+
+class Period(NamedTuple):
+    date: str
+    grade: str
+    classnum: str
+    period: int
+    subject: str
+
+
+class Event(NamedTuple):
+    date: str
+    name: str
+
+
+class SchoolInfo(NamedTuple):
+    name: str
+    fields: dict  # schoolInfo row 원본 (필드 코드 -> 값)
+
+
+class ClassRoom(NamedTuple):
+    grade: int
+    classnum: int
+
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class ParserSpec(NamedTuple):
+    envelope: str
+    date_field: Optional[str]
+    make_record: Callable[[dict], tuple]
+    sort_key: Optional[Callable] = None
+
+
+SPECS = {
+    "lunch": ParserSpec(
+        "mealServiceDietInfo", "MLSV_YMD",
+        lambda r: Meal(r.get("MLSV_YMD", ""), r.get("MMEAL_SC_NM", ""), r.get("DDISH_NM", ""), r.get("CAL_INFO", "")),
+    ),
+    "schedule": ParserSpec(
+        "hisTimetable", "ALL_TI_YMD",
+        lambda r: Period(r.get("ALL_TI_YMD", ""), str(r.get("GRADE", "")), str(r.get("CLASS_NM", "")),
+                         _int(r.get("PERIO")), (r.get("ITRT_CNTNT") or "").strip()),
+        sort_key=lambda p: (p.date, p.period),
+    ),
+    "year_sch": ParserSpec(
+        "SchoolSchedule", "AA_YMD",
+        lambda r: Event(r.get("AA_YMD", ""), r.get("EVENT_NM", "")),
+    ),
+    "inform": ParserSpec(
+        "schoolInfo", None,
+        lambda r: SchoolInfo(r.get("SCHUL_NM", ""), r),
+    ),
+    # 학년도별 학급 목록 (prefetch가 전 학년/반 시간표를 받을 때 사용)
+    "class_info": ParserSpec(
+        "classInfo", None,
+        lambda r: ClassRoom(_int(r.get("GRADE")), _int(r.get("CLASS_NM"))),
+        sort_key=lambda c: (c.grade, c.classnum),
+    ),
+}
+
+
+class NeisError(NamedTuple):
+    """파싱할 수 없는 응답 (호출 오류 메시지, 예상하지 못한 RESULT 코드 등)"""
+    message: str
+
+
+def payload_rows(api_name, payload):
+    """응답 하나에서 row 리스트를 꺼냅니다. 데이터 없음(INFO-200)은 빈 리스트, 오류는 NeisError."""
+    if not isinstance(payload, dict):
+        return NeisError(str(payload))
+    body = payload.get(SPECS[api_name].envelope)
+    if body is None:
+        result = payload.get("RESULT", {})
+        if result.get("CODE") == "INFO-200":
+            return []
+        return NeisError(result.get("MESSAGE", "알 수 없는 응답"))
+    rows = []
+    # head/row 블록 순서가 바뀌어도 row 블록만 모은다.
+    for block in body:
+        if isinstance(block, dict) and "row" in block:
+            rows.extend(block["row"])
+    return rows
+
+
+def parse_rows(api_name, rows):
+    """row 리스트를 레코드 리스트로 변환"""
+    spec = SPECS[api_name]
+    records = [spec.make_record(r) for r in rows]
+    if spec.sort_key is not None:
+        records.sort(key=spec.sort_key)
+    return records
+
+
+def parse_payload(api_name, payload):
+    """응답 하나를 레코드 리스트로. 오류 응답이면 NeisError"""
+    rows = payload_rows(api_name, payload)
+    if isinstance(rows, NeisError):
+        return rows
+    return parse_rows(api_name, rows)
+
+
+def parse_result(api_name, result, date):
+    """`call_school_api` 결과를 [(날짜, 레코드 리스트 또는 NeisError), ...]로 바꿉니다.
+
+    date가 리스트면 날짜별 dict로 보고, 아니면 단일 응답으로 봅니다.
+    """
+    if isinstance(date, list):
+        if not isinstance(result, dict):
+            return [(d, NeisError(str(result))) for d in date]
+        return [(d, parse_payload(api_name, result.get(d))) for d in date]
+    return [(date, parse_payload(api_name, result))]
+
+
+# 화면/모델에 넘길 한 줄짜리 요약 (값 부분만)
+
+def format_meal(records):
+    """중식만 있으면 "급식 ...", 조식/석식도 있으면 끼니별로 ("조식 ...; 중식 ...; 석식 ...")"""
+    if not records:
+        return "급식 정보 없음"
+    if len(records) == 1 and (records[0].meal_name or "중식") == "중식":
+        return f"급식 {records[0].dishes}"
+    return "; ".join(f"{m.meal_name or '급식'} {m.dishes}" for m in records)
+
+
+def format_periods(records):
+    return [f"{i}교시 {p.subject or '정보 없음'}" for i, p in enumerate(records, 1)] or ["시간표 정보 없음"]
+
+
+def format_event(records):
+    names = [e.name for e in records if e.name]
+    return f"일정 {', '.join(names)}" if names else "일정 없음"
+
+
+def format_value(api_name, records, info_type=None):
+    """레코드 리스트를 값 문자열 하나로 (`schoolapi.get_school_info`의 dict 값)"""
+    if isinstance(records, NeisError):
+        records = []
+    if api_name == "lunch":
+        return format_meal(records)
+    if api_name == "schedule":
+        return ", ".join(format_periods(records))
+    if api_name == "year_sch":
+        return format_event(records)
+    if api_name == "inform":
+        if not records:
+            return "정보 없음"
+        return f"정보 {records[0].fields.get(info_type, '정보 없음')}" if info_type else f"정보 {records[0].name}"
+    return ""
+
+
+def format_lines(api_name, parsed, info_type=None):
+    """`parse_result` 결과를 "날짜 : 값" 형식의 줄 리스트로 만듭니다."""
+    lines = []
+    for d, records in parsed:
+        if api_name == "inform":
+            if isinstance(records, NeisError) or not records:
+                message = records.message if isinstance(records, NeisError) else "해당하는 데이터가 없습니다."
+                lines.append(f"정보 조회 오류: {message}")
+                continue
+            row = records[0].fields
+            if info_type:
+                lines.append(f"학교 정보 - {info_type}: {row.get(info_type, '정보 없음')}")
+            else:
+                # info_type이 없으면 주요 정보를 모두 표시
+                lines.append(f"학교명: {row.get('SCHUL_NM', '학교명 없음')}")
+                lines.append(f"주소: {row.get('ORG_RDNMA', '주소 없음')}")
+                lines.append(f"전화번호: {row.get('ORG_TELNO', '전화번호 없음')}")
+            continue
+        if isinstance(records, NeisError):
+            records = []
+        if api_name == "lunch":
+            lines.append(f"{d} : {format_meal(records)}")
+        elif api_name == "schedule":
+            lines.extend(f"{d} : {value}" for value in format_periods(records))
+        elif api_name == "year_sch":
+            lines.append(f"{d} : {format_event(records)}")
+    return lines
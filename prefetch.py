@@ -0,0 +1,169 @@
+"""NEIS 캐시 미리 채우기 (prefetch)
+
+점심 직전과 아침 등교 시간에는 "오늘 급식", "오늘 시간표" 같은 같은 질문이 한꺼번에 몰립니다.
+이 모듈은 앞으로 며칠 치 급식, 전 학년/반 시간표, 학사일정을 기간 조회로 한꺼번에 받아
+`neis_cache`에 넣어 두어, 몰리는 시간대의 질문이 NEIS 응답을 기다리지 않게 합니다.
+
+- 명령줄: `python prefetch.py --days 7` (한 번 실행), `--loop`를 붙이면 주기적으로 반복
+- 앱 안에서: `start_scheduler()`가 백그라운드 스레드로 주기 실행 (NEIS_PREFETCH_INTERVAL로 켬)
+- 여러 학교: `--school 서현고 --school 7530081` 또는 NEIS_PREFETCH_SCHOOLS="서현고,7530081" (기본: DEFAULT_SCHOOL)
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import threading
+import time
+
+import pytz
+
+from schoolapi import NEIS_BASE_URL, call_school_api, fetch_json, fetch_many, get_neis_key
+from neis_parser import NeisError, parse_payload
+from school_registry import DEFAULT_SCHOOL, resolve_school
+
+# 며칠 앞까지 받아 둘지, 앱 안 스케줄러를 몇 초마다 돌릴지 (0이면 끔)
+PREFETCH_DAYS = int(os.getenv("NEIS_PREFETCH_DAYS", "7"))
+PREFETCH_INTERVAL = int(os.getenv("NEIS_PREFETCH_INTERVAL", "0"))
+# 미리 받아 둘 학교 (이름 또는 행정표준코드, 쉼표로 구분). 비우면 DEFAULT_SCHOOL만
+PREFETCH_SCHOOLS = [s.strip() for s in os.getenv("NEIS_PREFETCH_SCHOOLS", "").split(",") if s.strip()]
+CLASS_INFO_URL = f"{NEIS_BASE_URL}/classInfo"
+KST = pytz.timezone('Asia/Seoul')
+
+
+def upcoming_dates(days, start=None, weekdays_only=False):
+    """start(기본: 오늘, KST)부터 days일 동안의 YYYYMMDD 리스트"""
+    start = start or datetime.datetime.now(KST).date()
+    dates = [start + datetime.timedelta(days=i) for i in range(days)]
+    return [d.strftime("%Y%m%d") for d in dates if not weekdays_only or d.weekday() < 5]
+
+
+def school_year(day):
+    """학년도. 1~2월은 전년도 학년도에 속한다."""
+    return day.year if day.month >= 3 else day.year - 1
+
+
+def list_classes(day=None, school=None):
+    """classInfo로 이번 학년도의 학년별 반 번호를 가져온다. 예: {1: [1, 2, ...], 2: [...]}"""
+    service_key = get_neis_key()
+    if not service_key:
+        return {}
+    day = day or datetime.datetime.now(KST).date()
+    params = {
+        "KEY": service_key,
+        "Type": "json",
+        **(school or DEFAULT_SCHOOL).params(),
+        "AY": str(school_year(day)),
+        "pSize": "1000"
+    }
+    rooms = parse_payload("class_info", fetch_json(CLASS_INFO_URL, params))
+    if isinstance(rooms, NeisError):
+        raise RuntimeError(rooms.message)
+    classes = {}
+    for room in rooms:
+        if room.grade and room.classnum and room.classnum not in classes.get(room.grade, []):
+            classes.setdefault(room.grade, []).append(room.classnum)
+    return classes
+
+
+def prefetch(days=PREFETCH_DAYS, start=None, classes=None, refresh=True, school=None):
+    """school(기본: DEFAULT_SCHOOL)의 급식/학사일정/전 반 시간표를 days일 치 미리 받아 캐시에 넣는다.
+
+    날짜가 여러 개이므로 `call_school_api`가 연속 구간별로 기간 조회를 보내고 날짜별로 나눠 캐시한다.
+    refresh면 이미 캐시에 있어도 새로 받아 덮어쓴다. 반환값은 API별로 캐시에 넣은 날짜 수.
+    """
+    school_days = upcoming_dates(days, start, weekdays_only=True)
+    all_days = upcoming_dates(days, start)
+    school = school or DEFAULT_SCHOOL
+    summary = {}
+
+    def count(result):
+        if not isinstance(result, dict):
+            return 0
+        return sum(1 for value in result.values() if isinstance(value, dict))
+
+    if school_days:
+        summary["lunch"] = count(call_school_api("lunch", date=school_days, refresh=refresh, school=school))
+    summary["year_sch"] = count(call_school_api("year_sch", date=all_days, refresh=refresh, school=school))
+
+    if classes is None:
+        try:
+            classes = list_classes(start, school)
+        except Exception as e:
+            logging.warning(f"반 목록을 가져오지 못해 시간표 prefetch를 건너뜁니다: {e}")
+            classes = {}
+    queries = [dict(api_name="schedule", date=school_days, grade=grade, classnum=c, refresh=refresh,
+                    school=school)
+               for grade, nums in classes.items() for c in nums]
+    if queries and school_days:
+        summary["schedule"] = sum(count(result) for result in fetch_many(queries))
+    logging.info(f"NEIS prefetch 완료 ({school.name}): {summary}")
+    return summary
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def resolve_schools(values):
+    """학교 이름/코드 리스트 -> School 리스트. 찾지 못한 학교는 경고만 남기고 뺀다. 비어 있으면 [DEFAULT_SCHOOL]"""
+    schools = []
+    for value in values or ():
+        try:
+            school = resolve_school(value)
+        except ValueError as e:
+            logging.warning(f"prefetch 대상에서 뺍니다: {e}")
+            continue
+        if school not in schools:
+            schools.append(school)
+    return schools or [DEFAULT_SCHOOL]
+
+
+def _run_forever(interval, days, schools, stop_event):
+    while not stop_event.is_set():
+        # 한 학교가 실패해도 나머지 학교는 받는다
+        for school in resolve_schools(schools):
+            try:
+                prefetch(days, school=school)
+            except Exception:
+                logging.exception(f"NEIS prefetch 실패 ({school.name})")
+        stop_event.wait(interval)
+
+
+def start_scheduler(interval=PREFETCH_INTERVAL, days=PREFETCH_DAYS, schools=None):
+    """interval초마다 schools(기본: NEIS_PREFETCH_SCHOOLS)를 prefetch하는 백그라운드 스레드를 (한 번만) 시작한다.
+
+    interval이 0 이하면 아무것도 하지 않는다. 반환값은 멈출 때 쓰는 threading.Event (또는 None).
+    """
+    global _scheduler
+    if interval <= 0:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            stop_event = threading.Event()
+            thread = threading.Thread(target=_run_forever, args=(interval, days, schools or PREFETCH_SCHOOLS, stop_event),
+                                      name="neis-prefetch", daemon=True)
+            thread.start()
+            _scheduler = stop_event
+    return _scheduler
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    parser = argparse.ArgumentParser(description="NEIS 응답 캐시를 미리 채웁니다.")
+    parser.add_argument("--days", type=int, default=PREFETCH_DAYS, help="오늘부터 며칠 치를 받을지")
+    parser.add_argument("--loop", action="store_true", help="한 번으로 끝내지 않고 주기적으로 반복")
+    parser.add_argument("--interval", type=int, default=PREFETCH_INTERVAL or 6 * 60 * 60,
+                        help="--loop일 때 반복 간격(초)")
+    parser.add_argument("--school", action="append", default=[],
+                        help="받을 학교 이름 또는 행정표준코드 (여러 번 지정 가능, 기본: NEIS_PREFETCH_SCHOOLS 또는 기본 학교)")
+    args = parser.parse_args()
+    if not get_neis_key():
+        raise SystemExit("NEIS API 키가 설정되지 않았습니다. NEIS_API_KEY 환경 변수를 설정해주세요.")
+    while True:
+        started = time.monotonic()
+        for school in resolve_schools(args.school or PREFETCH_SCHOOLS):
+            print(school.name, prefetch(args.days, school=school))
+        if not args.loop:
+            break
+        time.sleep(max(0, args.interval - (time.monotonic() - started)))
@@ -0,0 +1,156 @@
+"""학교 기본 정보(schoolInfo) 필드 사전
+
+"학교 전화번호 알려줘" 같은 질문에서 필요한 필드 코드(ORG_TELNO 등)를 모델에게 묻지 않고
+동의어 사전과 difflib 유사도 매칭으로 바로 찾습니다. 사전은 모듈을 불러올 때 한 번만 만듭니다.
+"""
+
+import difflib
+import re
+
+# 한글 필드명 -> NEIS 필드 코드
+SCHOOL_INFO_FIELDS = {
+    "시도교육청코드": "ATPT_OFCDC_SC_CODE",
+    "시도교육청명": "ATPT_OFCDC_SC_NM",
+    "행정표준코드": "SD_SCHUL_CODE",
+    "학교명": "SCHUL_NM",
+    "영문학교명": "ENG_SCHUL_NM",
+    "학교종류명": "SCHUL_KND_SC_NM",
+    "시도명": "LCTN_SC_NM",
+    "관할조직명": "JU_ORG_NM",
+    "설립명": "FOND_SC_NM",
+    "도로명우편번호": "ORG_RDNZC",
+    "도로명주소": "ORG_RDNMA",
+    "도로명상세주소": "ORG_RDNDA",
+    "전화번호": "ORG_TELNO",
+    "홈페이지주소": "HMPG_ADRES",
+    "남녀공학구분명": "COEDU_SC_NM",
+    "팩스번호": "ORG_FAXNO",
+    "고등학교구분명": "HS_SC_NM",
+    "산업체특별학급존재여부": "INDST_SPECL_CCCCL_EXST_YN",
+    "고등학교일반전문구분명": "HS_GNRL_BUSNS_SC_NM",
+    "특수목적고등학교계열명": "SPCLY_PURPS_HS_ORD_NM",
+    "입시전후기구분명": "ENE_BFE_SEHF_SC_NM",
+    "주야구분명": "DGHT_SC_NM",
+    "설립일자": "FOND_YMD",
+    "개교기념일": "FOAS_MEMRD",
+    "수정일자": "LOAD_DTM"
+}
+
+# 질문에 실제로 나오는 표현들. 필드명과 같이 띄어쓰기를 뺀 형태로 비교한다.
+# "주간", "위치", "교명"처럼 다른 질문("학교 주간 일정", "급식실 위치", "교명 유래")에도 흔한 말은
+# 그대로 넣지 않고 "주간학교", "학교위치"처럼 한정어가 붙은 형태만 넣는다.
+FIELD_SYNONYMS = {
+    "SCHUL_NM": ["학교이름", "학교명"],
+    "ENG_SCHUL_NM": ["영문이름", "영어이름", "영문명", "영어로"],
+    "ORG_RDNMA": ["주소", "학교위치"],
+    "ORG_RDNDA": ["상세주소"],
+    "ORG_RDNZC": ["우편번호"],
+    "ORG_TELNO": ["전화", "연락처", "대표번호", "교무실번호"],
+    "ORG_FAXNO": ["팩스"],
+    "HMPG_ADRES": ["홈페이지", "웹사이트", "사이트", "누리집"],
+    "COEDU_SC_NM": ["남녀공학", "공학", "남고", "여고"],
+    "FOND_YMD": ["설립일", "설립연도", "설립년도"],
+    "FOAS_MEMRD": ["개교기념일", "기념일"],
+    "FOND_SC_NM": ["공립", "사립", "설립구분"],
+    "SCHUL_KND_SC_NM": ["학교종류", "학교유형"],
+    "HS_SC_NM": ["일반고", "특목고", "자율고"],
+    "DGHT_SC_NM": ["주야간", "주간학교", "야간학교"],
+    "JU_ORG_NM": ["교육지원청", "관할"],
+    "ATPT_OFCDC_SC_NM": ["교육청"],
+    "LCTN_SC_NM": ["시도", "지역"],
+    "LOAD_DTM": ["수정일"],
+}
+# 활용형이 여러 가지인 표현은 어간으로 단어 앞부분을 본다. ("세워진", "세워졌어")
+STEM_SYNONYMS = {
+    "세워": "FOND_YMD",
+}
+# 단어 앞에 붙어도 같은 필드로 보는 학교 한정어. ("학교전화번호", "우리학교 주소")
+CONTEXT_PREFIXES = ("우리학교", "저희학교", "학교", "본교")
+# 띄어 쓴 단어를 몇 개까지 이어 붙여 보는지 ("개교 기념일", "도로명 상세 주소")
+MAX_SPAN = 3
+# 유사도 매칭에서 이 값보다 비슷해야 같은 말로 본다. ("학교" -> "학교명"이 0.8이라 그보다 높게)
+FUZZY_CUTOFF = 0.85
+# 거의 모든 질문에 나오는 말. 유사도 매칭에서 빼야 모르는 질문이 "학교명" 등으로 잘못 잡히지 않고 모델로 간다.
+GENERIC_WORDS = {"학교", "우리", "우리학교", "저희", "저희학교", "알려줘", "알려주세요", "뭐", "뭐야", "어디", "어디야",
+                 "있어", "몇", "언제"}
+
+_WORD = re.compile(r"[가-힣A-Za-z]+")
+# 단어 끝 조사. 유사도 매칭 전에 떼어낸다.
+_PARTICLE = re.compile(r"(은|는|이|가|을|를|의|도|좀|이랑|랑|하고|와|과|이야|야|가요|예요|이에요|요)$")
+
+
+def _build_index():
+    index = {}
+    for name, code in SCHOOL_INFO_FIELDS.items():
+        index[name] = code
+        # "도로명주소" -> "주소"처럼 흔히 쓰는 뒷부분도 같이 등록
+        for prefix in ("도로명", "시도"):
+            if name.startswith(prefix) and len(name) > len(prefix) + 1:
+                index.setdefault(name[len(prefix):], code)
+    for code, words in FIELD_SYNONYMS.items():
+        for word in words:
+            index[word] = code
+    return index
+
+
+FIELD_INDEX = _build_index()
+_TERMS = sorted(FIELD_INDEX, key=len, reverse=True)
+FIELD_LABELS = {code: name for name, code in SCHOOL_INFO_FIELDS.items()}
+
+
+def _lookup(term):
+    """이어 붙인 단어 하나가 가리키는 필드 코드. 앞에 붙은 학교 한정어는 떼고 본다. 없으면 None"""
+    for prefix in ("",) + CONTEXT_PREFIXES:
+        if not term.startswith(prefix):
+            continue
+        rest = term[len(prefix):]
+        if rest in FIELD_INDEX:
+            return FIELD_INDEX[rest]
+        for stem, code in STEM_SYNONYMS.items():
+            if rest.startswith(stem):
+                return code
+    return None
+
+
+def resolve_fields(text, fuzzy=True):
+    """질문에서 필요한 schoolInfo 필드 코드를 언급 순서대로 찾습니다. 없으면 빈 리스트.
+
+    사전 표현과 단어 단위로 같은지 먼저 보고(띄어 쓴 단어는 MAX_SPAN개까지 이어 붙여 봄),
+    하나도 없을 때만 단어별 유사도 매칭을 합니다. "급식실위치"처럼 다른 말 안에 든 표현은 잡지 않습니다.
+    """
+    words = _WORD.findall(text or "")
+    found = []
+    used = set()
+    # 긴 묶음을 먼저 봐야 "도로명 상세 주소"가 "주소"로 잡히지 않는다.
+    for span in range(min(MAX_SPAN, len(words)), 0, -1):
+        for start in range(len(words) - span + 1):
+            positions = set(range(start, start + span))
+            if positions & used:
+                continue
+            head = "".join(words[start:start + span - 1])
+            last = words[start + span - 1]
+            # "시도"의 "도"처럼 조사와 같은 글자로 끝나는 표현이 있어 조사를 떼기 전 형태도 본다.
+            for tail in dict.fromkeys([last, _PARTICLE.sub("", last)]):
+                code = _lookup(head + tail)
+                if code:
+                    found.append((start, code))
+                    used |= positions
+                    break
+    if not found and fuzzy:
+        for pos, word in enumerate(words):
+            word = _PARTICLE.sub("", word)
+            if len(word) < 2 or word in GENERIC_WORDS:
+                continue
+            match = difflib.get_close_matches(word, _TERMS, n=1, cutoff=FUZZY_CUTOFF)
+            if match:
+                found.append((pos, FIELD_INDEX[match[0]]))
+    codes = []
+    for _, code in sorted(found):
+        if code not in codes:
+            codes.append(code)
+    return codes
+
+
+def field_label(code):
+    """필드 코드의 한글 이름"""
+    return FIELD_LABELS.get(code, code)
@@ -0,0 +1,244 @@
+"""학교 목록(registry)과 학교별 호출 한도
+
+NEIS `schoolInfo`의 전국 학교 목록을 한 번에 받아 SQLite에 색인해 두고 학교 이름으로 코드를 찾습니다.
+한 프로세스가 여러 학교를 같이 서비스할 수 있도록 NEIS 호출, 캐시, prefetch, 호출 한도는 모두
+`School`(시도교육청코드 + 행정표준코드) 단위로 나뉩니다. 학교를 지정하지 않으면 `DEFAULT_SCHOOL`을 씁니다.
+
+- 목록 받기: `python school_registry.py --refresh` (교육청 하나만: `--office J10`)
+- 찾기: `python school_registry.py 서현고`
+"""
+
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+from neis_client import QuotaExceeded  # noqa: F401  (SchoolQuota와 같이 쓰도록 다시 내보냄)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".neis_schools.sqlite3")
+# 학교 하나가 분당 보낼 수 있는 NEIS 요청 수 (0이면 제한 없음). 캐시 적중은 세지 않는다.
+SCHOOL_QUOTA_PER_MINUTE = int(os.getenv("NEIS_SCHOOL_QUOTA", "0"))
+QUOTA_WINDOW = 60
+REFRESH_PAGE_SIZE = 1000
+# 이름 검색 결과 최대 개수
+LOOKUP_LIMIT = 10
+
+
+class School(NamedTuple):
+    office_code: str  # ATPT_OFCDC_SC_CODE
+    school_code: str  # SD_SCHUL_CODE (전국에서 유일)
+    name: str
+    kind: str = ""
+    region: str = ""
+    address: str = ""
+
+    @property
+    def key(self):
+        """캐시/한도/prefetch를 나누는 키"""
+        return self.school_code
+
+    def params(self):
+        """NEIS 요청에 넣을 학교 파라미터"""
+        return {"ATPT_OFCDC_SC_CODE": self.office_code, "SD_SCHUL_CODE": self.school_code}
+
+
+DEFAULT_SCHOOL = School("J10", "7530081", "서현고등학교", "고등학교", "경기도")
+
+
+def normalize_name(name):
+    """검색용 이름: 공백/기호를 빼고 소문자로 ("서현 고등학교" -> "서현고등학교")"""
+    return re.sub(r"[\s\W_]+", "", name or "").lower()
+
+
+def school_from_row(row):
+    """NEIS schoolInfo row -> School"""
+    return School(row.get("ATPT_OFCDC_SC_CODE", ""), row.get("SD_SCHUL_CODE", ""), row.get("SCHUL_NM", ""),
+                  row.get("SCHUL_KND_SC_NM", "") or "", row.get("LCTN_SC_NM", "") or "", row.get("ORG_RDNMA", "") or "")
+
+
+class SchoolRegistry:
+    """학교 목록 SQLite 색인. 여러 스레드에서 같이 써도 된다."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path or ":memory:"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS schools ("
+            "school_code TEXT PRIMARY KEY, office_code TEXT, name TEXT, kind TEXT, region TEXT, address TEXT, "
+            "search_name TEXT, updated_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS schools_search_name ON schools (search_name)")
+        self._conn.commit()
+
+    def add(self, schools):
+        """학교들을 넣거나 갱신. 넣은 개수를 반환"""
+        now = time.time()
+        rows = [(s.school_code, s.office_code, s.name, s.kind, s.region, s.address, normalize_name(s.name), now)
+                for s in schools if s.school_code and s.name]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO schools VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+        return len(rows)
+
+    def refresh(self, office_code=None):
+        """NEIS schoolInfo 전체(또는 교육청 하나)를 페이지를 넘겨가며 받아 색인을 갱신한다. 받은 학교 수를 반환"""
+        from neis_parser import NeisError, payload_rows
+        from schoolapi import BASE_URLS, fetch_json, get_neis_key
+
+        service_key = get_neis_key()
+        if not service_key:
+            raise RuntimeError("NEIS API 키가 설정되지 않았습니다.")
+        params = {"KEY": service_key, "Type": "json", "pSize": str(REFRESH_PAGE_SIZE)}
+        if office_code:
+            params["ATPT_OFCDC_SC_CODE"] = office_code
+        total, page = 0, 1
+        while True:
+            params["pIndex"] = str(page)
+            rows = payload_rows("inform", fetch_json(BASE_URLS["inform"], params))
+            if isinstance(rows, NeisError):
+                raise RuntimeError(rows.message)
+            if not rows:
+                break
+            total += self.add(school_from_row(row) for row in rows)
+            if len(rows) < REFRESH_PAGE_SIZE:
+                break
+            page += 1
+        logging.info(f"학교 목록 갱신: {total}개 학교")
+        return total
+
+    def get(self, school_code):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT office_code, school_code, name, kind, region, address FROM schools WHERE school_code = ?",
+                (str(school_code),)
+            ).fetchone()
+        return School(*row) if row else None
+
+    def lookup(self, name, limit=LOOKUP_LIMIT):
+        """이름으로 학교 찾기. 정확히 같은 이름 → 앞부분 일치("서현고" → 서현고등학교) → 포함 순서"""
+        key = normalize_name(name)
+        if not key:
+            return []
+        pattern = key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT office_code, school_code, name, kind, region, address FROM schools "
+                "WHERE search_name LIKE ? ESCAPE '\\' "
+                "ORDER BY CASE WHEN search_name = ? THEN 0 WHEN search_name LIKE ? ESCAPE '\\' THEN 1 ELSE 2 END, "
+                "length(search_name), name LIMIT ?",
+                (f"%{pattern}%", key, f"{pattern}%", limit)
+            ).fetchall()
+        return [School(*row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM schools").fetchone()[0]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """프로세스 전체에서 공유하는 학교 목록. 경로는 NEIS_REGISTRY_PATH 환경변수로 바꿀 수 있다."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SchoolRegistry(os.getenv("NEIS_REGISTRY_PATH", DEFAULT_PATH))
+                # 목록을 아직 받지 않았어도 기본 학교는 찾을 수 있게
+                if _registry.get(DEFAULT_SCHOOL.school_code) is None:
+                    _registry.add([DEFAULT_SCHOOL])
+    return _registry
+
+
+def resolve_school(value=None):
+    """School, 행정표준코드, 학교 이름 중 무엇이든 School로. None이면 DEFAULT_SCHOOL, 못 찾으면 ValueError"""
+    if value is None or value == "":
+        return DEFAULT_SCHOOL
+    if isinstance(value, School):
+        return value
+    value = str(value).strip()
+    registry = get_registry()
+    if value.isdigit():
+        school = registry.get(value)
+    else:
+        matches = registry.lookup(value, limit=1)
+        school = matches[0] if matches else None
+    if school is None:
+        raise ValueError(f"학교를 찾을 수 없음: {value}")
+    return school
+
+
+class SchoolQuota:
+    """학교별 NEIS 요청 한도 (최근 window초 동안 limit개). 한 학교가 공유 키의 호출량을 다 쓰지 않게 한다.
+
+    `schoolapi.fetch_json`을 거친 SD_SCHUL_CODE가 있는 요청(기간 조회의 페이지마다, classInfo 포함) 중
+    `NeisClient`가 실제로 보낸 요청만 센다. 캐시 적중과 single-flight로 결과를 나눠 받은 요청은 세지 않는다.
+    학교 목록 갱신(`SchoolRegistry.refresh`)은 특정 학교의 요청이 아니므로 세지 않는다.
+    """
+
+    def __init__(self, limit=SCHOOL_QUOTA_PER_MINUTE, window=QUOTA_WINDOW):
+        self.limit = limit
+        self.window = window
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.rejected = {}
+
+    def acquire(self, school_key, count=1):
+        """요청 count개를 보내도 되면 기록하고 True. 한도를 넘으면 False"""
+        if self.limit <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            calls = self._calls.setdefault(school_key, deque())
+            while calls and calls[0] <= now - self.window:
+                calls.popleft()
+            if len(calls) + count > self.limit:
+                self.rejected[school_key] = self.rejected.get(school_key, 0) + 1
+                return False
+            calls.extend([now] * count)
+            return True
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {key: {"recent": sum(1 for t in calls if t > now - self.window),
+                          "rejected": self.rejected.get(key, 0)}
+                    for key, calls in self._calls.items()}
+
+
+_quota = None
+_quota_lock = threading.Lock()
+
+
+def get_quota():
+    global _quota
+    if _quota is None:
+        with _quota_lock:
+            if _quota is None:
+                _quota = SchoolQuota()
+    return _quota
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    parser = argparse.ArgumentParser(description="NEIS 학교 목록을 받아 색인하고 이름으로 찾습니다.")
+    parser.add_argument("name", nargs="?", help="찾을 학교 이름")
+    parser.add_argument("--refresh", action="store_true", help="NEIS에서 학교 목록을 새로 받기")
+    parser.add_argument("--office", help="--refresh 때 이 시도교육청 코드만 받기 (예: J10)")
+    args = parser.parse_args()
+    registry = get_registry()
+    if args.refresh:
+        print(f"{registry.refresh(args.office)}개 학교를 받았습니다.")
+    if args.name:
+        for school in registry.lookup(args.name):
+            print(f"{school.office_code} {school.school_code} {school.name} ({school.region} {school.kind})")
+    elif not args.refresh:
+        print(f"색인된 학교: {registry.count()}개")
@@ -1,5 +1,12 @@
-import requests
 import os
+import datetime
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from neis_cache import get_cache
+from neis_client import get_client
+from neis_parser import SPECS, NeisError, format_lines, format_value, parse_result, payload_rows
+from school_registry import DEFAULT_SCHOOL, get_quota, resolve_school
+import telemetry
 try:
     import streamlit as st
     has_streamlit = True
@@ -15,131 +22,297 @@ def get_neis_key():
             pass
     return os.getenv("NEIS_API_KEY")
 
-def call_school_api(api_name, date=None, grade=None, classnum=None, info_type=None):
+# NEIS 오픈 API 주소 (벤치마크 등에서 로컬 대역 서버로 바꿀 때 NEIS_BASE_URL 설정)
+NEIS_BASE_URL = os.getenv("NEIS_BASE_URL", "https://open.neis.go.kr/hub").rstrip("/")
+
+BASE_URLS = {
+    "lunch": f"{NEIS_BASE_URL}/mealServiceDietInfo",
+    "schedule": f"{NEIS_BASE_URL}/hisTimetable",
+    "inform": f"{NEIS_BASE_URL}/schoolInfo",
+    "year_sch": f"{NEIS_BASE_URL}/SchoolSchedule"
+}
+
+# 응답 JSON에서 데이터가 들어있는 최상위 키
+ENVELOPE_KEYS = {name: spec.envelope for name, spec in SPECS.items()}
+
+# 기간 조회용 파라미터: (시작일 키, 종료일 키, 응답 row의 날짜 필드)
+RANGE_PARAMS = {
+    "lunch": ("MLSV_FROM_YMD", "MLSV_TO_YMD", SPECS["lunch"].date_field),
+    "schedule": ("TI_FROM_YMD", "TI_TO_YMD", SPECS["schedule"].date_field),
+    "year_sch": ("AA_FROM_YMD", "AA_TO_YMD", SPECS["year_sch"].date_field)
+}
+
+# 여러 날짜 조회 시 연속된 날짜를 묶어 기간 조회 한 번으로 처리할지 여부
+USE_RANGE_QUERIES = True
+# 떨어진 날짜/여러 반을 조회할 때 동시에 보낼 최대 요청 수
+MAX_CONCURRENCY = int(os.getenv("NEIS_MAX_CONCURRENCY", "6"))
+# NEIS가 허용하는 최대 페이지 크기
+RANGE_PAGE_SIZE = 1000
+# 이 일수 이하로 떨어진 날짜는 한 구간으로 묶는다 (금요일~월요일처럼 주말을 사이에 둔 평일)
+RANGE_MAX_GAP = 3
+# 기간 조회 결과에서 해당 날짜에 데이터가 없을 때 돌려줄 응답 (NEIS의 INFO-200과 동일한 형태)
+NO_DATA_RESULT = {"RESULT": {"CODE": "INFO-200", "MESSAGE": "해당하는 데이터가 없습니다."}}
+
+def build_params(api_name, service_key, single_date=None, grade=None, classnum=None, school=None):
+    """단일 날짜 조회용 NEIS 요청 파라미터를 만든다. 지원하지 않는 API면 None"""
+    params = {
+        "KEY": service_key,
+        "Type": "json",
+        **(school or DEFAULT_SCHOOL).params()
+    }
+    if api_name == "lunch":
+        # 조식/중식/석식이 따로 오므로 하루 치를 모두 받는다 (끼니 구분은 파싱/답변 단계에서)
+        params.update({"MLSV_YMD": single_date, "pSize": "3"})
+    elif api_name == "schedule":
+        params.update({"GRADE": grade, "CLASS_NM": classnum, "ALL_TI_YMD": single_date, "pSize": "20"})
+    elif api_name == "inform":
+        params.update({"pSize": "10"})
+    elif api_name == "year_sch":
+        params.update({"AA_YMD": single_date, "pSize": "1"})
+    else:
+        return None
+    return params
+
+def fetch_json(url, params):
+    """NEIS 엔드포인트를 GET으로 호출해 JSON을 반환. 오류는 그대로 raise
+
+    공유 `NeisClient`를 통해 keep-alive 세션, 타임아웃, 재시도, 회로 차단기가 적용된다.
+    params에 학교(SD_SCHUL_CODE)가 있으면 실제로 보내는 요청마다 그 학교의 호출 한도(NEIS_SCHOOL_QUOTA)를
+    하나씩 쓰고(같은 요청을 기다려 결과를 나눠 받으면 쓰지 않음), 한도를 넘으면 보내지 않고 `QuotaExceeded`를 raise한다.
+    """
+    telemetry.incr("neis_requests")
+    return get_client().get_json(url, params, school_key=params.get("SD_SCHUL_CODE"), quota=get_quota())
+
+def _parse_ymd(value):
+    try:
+        return datetime.datetime.strptime(str(value), "%Y%m%d").date()
+    except (TypeError, ValueError):
+        return None
+
+def plan_date_ranges(dates):
+    """날짜 리스트를 연속된(또는 RANGE_MAX_GAP일 이내로 떨어진) 구간으로 묶는다.
+
+    반환값은 (시작일, 종료일, 구간에 속한 날짜 리스트) 튜플의 리스트와
+    YYYYMMDD로 해석할 수 없어 개별 조회해야 하는 날짜 리스트.
+    """
+    parsed = {}
+    invalid = []
+    for d in dates:
+        day = _parse_ymd(d)
+        if day is None:
+            if d not in invalid:
+                invalid.append(d)
+        else:
+            parsed[d] = day
+    spans = []
+    for d in sorted(parsed, key=parsed.get):
+        if spans and (parsed[d] - parsed[spans[-1][-1]]).days <= RANGE_MAX_GAP:
+            spans[-1].append(d)
+        else:
+            spans.append([d])
+    return [(span[0], span[-1], span) for span in spans], invalid
+
+def range_query(api_name, service_key, start, end, grade=None, classnum=None, school=None):
+    """기간 파라미터로 start~end의 모든 row를 페이지를 넘겨가며 가져온다."""
+    from_key, to_key, _ = RANGE_PARAMS[api_name]
+    envelope = ENVELOPE_KEYS[api_name]
+    params = {
+        "KEY": service_key,
+        "Type": "json",
+        **(school or DEFAULT_SCHOOL).params(),
+        from_key: start,
+        to_key: end,
+        "pSize": str(RANGE_PAGE_SIZE)
+    }
+    if api_name == "schedule":
+        params.update({"GRADE": grade, "CLASS_NM": classnum})
+    rows = []
+    page = 1
+    while True:
+        params["pIndex"] = str(page)
+        data = fetch_json(BASE_URLS[api_name], params)
+        # 해당 기간에 데이터가 없으면 RESULT(INFO-200)만 온다
+        page_rows = payload_rows(api_name, data)
+        if isinstance(page_rows, NeisError):
+            raise RuntimeError(page_rows.message)
+        if not page_rows:
+            break
+        try:
+            total = int(data[envelope][0]["head"][0]["list_total_count"])
+        except (KeyError, IndexError, TypeError, ValueError):
+            total = None
+        rows.extend(page_rows)
+        if len(page_rows) < RANGE_PAGE_SIZE or (total is not None and len(rows) >= total):
+            break
+        page += 1
+    return rows
+
+def split_rows_by_date(api_name, rows, dates):
+    """기간 조회로 받은 row들을 날짜별 단일 조회 응답과 같은 모양으로 나눈다."""
+    _, _, date_field = RANGE_PARAMS[api_name]
+    envelope = ENVELOPE_KEYS[api_name]
+    by_date = {d: [] for d in dates}
+    for row in rows:
+        day = row.get(date_field)
+        if day in by_date:
+            by_date[day].append(row)
+    out = {}
+    for d, day_rows in by_date.items():
+        if not day_rows:
+            out[d] = NO_DATA_RESULT
+            continue
+        if api_name == "schedule":
+            day_rows.sort(key=lambda r: int(r.get("PERIO") or 0))
+        out[d] = {envelope: [
+            {"head": [{"list_total_count": len(day_rows)}, {"RESULT": {"CODE": "INFO-000", "MESSAGE": "정상 처리되었습니다."}}]},
+            {"row": day_rows}
+        ]}
+    return out
+
+def run_concurrently(jobs, max_workers=None):
+    """인자 없는 함수들을 스레드 풀에서 동시에 실행하고 입력 순서대로 결과를 반환.
+
+    예외가 난 항목은 결과 자리에 예외 객체가 들어간다. 동시 실행 수는 max_workers,
+    지정하지 않으면 MAX_CONCURRENCY로 제한된다.
+    """
+    if not jobs:
+        return []
+    workers = min(max_workers or MAX_CONCURRENCY, len(jobs))
+    if workers <= 1:
+        out = []
+        for job in jobs:
+            try:
+                out.append(job())
+            except Exception as e:
+                out.append(e)
+        return out
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="neis") as executor:
+        # 작업 스레드에서도 호출한 쪽의 현재 턴/단계(telemetry)에 기록되도록 context를 넘긴다
+        futures = [executor.submit(contextvars.copy_context().run, job) for job in jobs]
+    out = []
+    for future in futures:
+        error = future.exception()
+        out.append(error if error is not None else future.result())
+    return out
+
+def cache_stats():
+    """NEIS 응답 캐시의 적중/미스 통계"""
+    return get_cache().stats()
+
+def call_school_api(api_name, date=None, grade=None, classnum=None, info_type=None, use_ranges=None, use_cache=True,
+                    max_workers=None, refresh=False, school=None):
+    """NEIS 조회. school(`School`)을 주지 않으면 DEFAULT_SCHOOL. 캐시와 호출 한도는 학교별로 나뉜다."""
     service_key = get_neis_key()
     if not service_key:
         return "NEIS API 키가 설정되지 않았습니다. .streamlit/secrets.toml 파일에 추가하거나 NEIS_API_KEY 환경 변수를 설정해주세요."
-    base_urls = {
-        "lunch": "https://open.neis.go.kr/hub/mealServiceDietInfo",
-        "schedule": "https://open.neis.go.kr/hub/hisTimetable",
-        "inform": "https://open.neis.go.kr/hub/schoolInfo",
-        "year_sch": "https://open.neis.go.kr/hub/SchoolSchedule"
-    }
+    if use_ranges is None:
+        use_ranges = USE_RANGE_QUERIES
+    school = school or DEFAULT_SCHOOL
+    cache = get_cache() if use_cache else None
+    # 학년/반은 시간표에서만 의미가 있으므로 캐시 키에서도 시간표일 때만 사용
+    key_grade, key_classnum = (grade, classnum) if api_name == "schedule" else (None, None)
+    def from_cache(single_date):
+        # refresh면 캐시를 읽지 않고 새로 받아 덮어쓴다 (prefetch 작업용)
+        if cache is None or refresh:
+            return None
+        cached = cache.get(api_name, single_date, key_grade, key_classnum, school.key)
+        telemetry.incr("cache_misses" if cached is None else "cache_hits")
+        return cached
+    def to_cache(single_date, value):
+        if cache is not None:
+            cache.set(api_name, single_date, key_grade, key_classnum, value, school.key)
     def single_query(single_date):
-        params = {
-            "KEY": service_key,
-            "Type": "json",
-            "ATPT_OFCDC_SC_CODE": "J10",
-            "SD_SCHUL_CODE": "7530081"
-        }
-        if api_name == "lunch":
-            params.update({"MLSV_YMD": single_date, "pSize": "1"})
-        elif api_name == "schedule":
-            params.update({"GRADE": grade, "CLASS_NM": classnum, "ALL_TI_YMD": single_date, "pSize": "20"})
-        elif api_name == "inform":
-            params.update({"pSize": "10"})
-        elif api_name == "year_sch":
-            params.update({"AA_YMD": single_date, "pSize": "1"})
-        else:
+        # 학교 기본정보는 날짜와 무관하므로 날짜 없이 캐시
+        cache_date = None if api_name == "inform" else single_date
+        cached = from_cache(cache_date)
+        if cached is not None:
+            return cached
+        params = build_params(api_name, service_key, single_date, grade, classnum, school)
+        if params is None:
             return "지원하지 않는 API"
-        url = base_urls.get(api_name)
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+            result = fetch_json(BASE_URLS[api_name], params)
         except Exception as e:
             return f"API 호출 오류: {e}"
-    # 날짜가 리스트면 반복 호출, 아니면 단일 호출
-    if isinstance(date, list):
-        results = {}
-        for d in date:
-            results[d] = single_query(d)
-        return results
-    else:
+        to_cache(cache_date, result)
+        return result
+    def span_query(start, end, span_dates):
+        try:
+            rows = range_query(api_name, service_key, start, end, grade, classnum, school)
+        except Exception as e:
+            return {d: f"API 호출 오류: {e}" for d in span_dates}
+        out = split_rows_by_date(api_name, rows, span_dates)
+        if cache is not None:
+            # 기간 조회 한 번의 결과는 디스크에 한 번에 쓴다
+            cache.set_many([(api_name, d, key_grade, key_classnum, value) for d, value in out.items()], school.key)
+        return out
+    if not isinstance(date, list):
         return single_query(date)
+    results = {}
+    if use_ranges and api_name in RANGE_PARAMS and len(date) > 1:
+        # 캐시에 없는 날짜만 모아서 연속 구간별로 기간 조회 한 번씩 보낸다
+        pending = []
+        for d in date:
+            cached = from_cache(d)
+            if cached is not None:
+                results[d] = cached
+            elif d not in pending:
+                pending.append(d)
+        spans, invalid = plan_date_ranges(pending)
+        # 서로 떨어진 구간과 해석할 수 없는 날짜는 동시에 조회
+        jobs = [lambda a=start, b=end, c=span_dates: span_query(a, b, c) for start, end, span_dates in spans]
+        jobs += [lambda d=d: {d: single_query(d)} for d in invalid]
+        for out in run_concurrently(jobs, max_workers):
+            if isinstance(out, Exception):
+                continue
+            results.update(out)
+        return {d: results.get(d, "API 호출 오류: 응답 없음") for d in date}
+    # 날짜가 리스트면 날짜별로 동시에 호출
+    unique = list(dict.fromkeys(date))
+    for d, out in zip(unique, run_concurrently([lambda d=d: single_query(d) for d in unique], max_workers)):
+        results[d] = f"API 호출 오류: {out}" if isinstance(out, Exception) else out
+    return {d: results[d] for d in date}
 
-# 결과 파싱 함수 분리
+def fetch_many(queries, max_workers=None):
+    """여러 `call_school_api` 호출을 동시에 실행한다.
+
+    queries는 `call_school_api`의 키워드 인자 dict 리스트. 결과는 입력 순서대로 반환되며
+    한 항목이 실패해도 나머지에는 영향이 없다(실패한 항목은 오류 메시지 문자열).
+    예: 2학년 1~10반 시간표 -> [{"api_name": "schedule", "date": d, "grade": 2, "classnum": c} for c in range(1, 11)]
+    """
+    jobs = [lambda q=q: call_school_api(**q) for q in queries]
+    return [f"API 호출 오류: {out}" if isinstance(out, Exception) else out
+            for out in run_concurrently(jobs, max_workers)]
+
+# 결과 파싱은 neis_parser의 엔드포인트별 명세로 처리
 
 def extract_school_api_result(api_name, result, date, info_type=None):
-    output = []
-    if isinstance(result, dict) and isinstance(date, list):
-        for d in date:
-            if api_name == "lunch":
-                try:
-                    meal = result[d].get('mealServiceDietInfo', [{}])[1].get('row', [{}])[0].get('DDISH_NM', '정보 없음')
-                except Exception:
-                    meal = '정보 없음'
-                output.append(f"{d} : 급식 {meal}")
-            elif api_name == "schedule":
-                try:
-                    rows = result[d].get('hisTimetable', [{}])[1].get('row', [])
-                except Exception:
-                    rows = []
-                if rows:
-                    for i, r in enumerate(rows, 1):
-                        output.append(f"{d} : {i}교시 {r.get('ITRT_CNTNT', '정보 없음')}")
-                else:
-                    output.append(f"{d} : 시간표 정보 없음")
-            elif api_name == "year_sch":
-                try:
-                    event = result[d].get('SchoolSchedule', [{}])[1].get('row', [{}])[0].get('EVENT_NM', '일정 없음')
-                except Exception:
-                    event = '일정 없음'
-                output.append(f"{d} : 일정 {event}")
-            elif api_name == "inform":
-                try:
-                    info = result[d].get('schoolInfo', [{}])[1].get('row', [{}])[0].get(info_type, '정보 없음')
-                except Exception:
-                    info = '정보 없음'
-                output.append(f"{d} : 정보 {info}")
-            else:
-                output.append(f"{d} : {result[d]}")
-    else:
-        if api_name == "year_sch":
-            try:
-                event = result.get('SchoolSchedule', [{}])[1].get('row', [{}])[0].get('EVENT_NM', '일정 없음')
-            except Exception:
-                event = '일정 없음'
-            output.append(f"{date} : 일정 {event}")
-        elif api_name == "lunch":
-            try:
-                meal = result.get('mealServiceDietInfo', [{}])[1].get('row', [{}])[0].get('DDISH_NM', '정보 없음')
-            except Exception:
-                meal = '정보 없음'
-            output.append(f"{date} : 급식 {meal}")
-        elif api_name == "schedule":
-            try:
-                rows = result.get('hisTimetable', [{}])[1].get('row', [])
-            except Exception:
-                rows = []
-            if rows:
-                for i, r in enumerate(rows, 1):
-                    output.append(f"{date} : {i}교시 {r.get('ITRT_CNTNT', '정보 없음')}")
-            else:
-                output.append(f"{date} : 시간표 정보 없음")
-        elif api_name == "inform":
-            try:
-                info = result.get('schoolInfo', [{}])[1].get('row', [{}])[0].get(info_type, '정보 없음')
-            except Exception:
-                info = '정보 없음'
-            output.append(f"{date} : 정보 {info}")
-        else:
-            output.append(str(result))
-    return output
+    """`call_school_api` 결과를 "날짜 : 값" 형식의 줄 리스트로 바꾼다."""
+    if api_name not in SPECS:
+        if isinstance(result, dict) and isinstance(date, list):
+            return [f"{d} : {result.get(d)}" for d in date]
+        return [str(result)]
+    return format_lines(api_name, parse_result(api_name, result, date), info_type)
 
-def get_school_info(api_name, date=None, grade=None, classnum=None, info_type=None):
+def get_school_info(api_name, date=None, grade=None, classnum=None, info_type=None, school=None):
     """
     API 호출부터 정리된 데이터 추출까지 한 번에 반환하는 함수.
-    항상 딕셔너리 형태로 반환.
+    항상 날짜 -> 값 문자열 딕셔너리 형태로 반환.
+    classnum에 반 번호 리스트를 주면 반별로 동시에 조회하고 키 앞에 "학년-반"을 붙인다.
+    school(`School`)을 주지 않으면 DEFAULT_SCHOOL을 조회한다.
     """
-    result = call_school_api(api_name, date=date, grade=grade, classnum=classnum, info_type=info_type)
-    lines = extract_school_api_result(api_name, result, date, info_type)
-    out = {}
-    for line in lines:
-        if ':' in line:
-            key, value = line.split(':', 1)
-            out[key.strip()] = value.strip()
-    return out
+    if api_name not in SPECS:
+        return {}
+    if isinstance(classnum, list):
+        results = fetch_many([dict(api_name=api_name, date=date, grade=grade, classnum=c, school=school)
+                              for c in classnum])
+        out = {}
+        for c, result in zip(classnum, results):
+            for d, records in parse_result(api_name, result, date):
+                out[f"{grade}-{c} {d}"] = format_value(api_name, records, info_type)
+        return out
+    result = call_school_api(api_name, date=date, grade=grade, classnum=classnum, info_type=info_type, school=school)
+    return {str(d): format_value(api_name, records, info_type) for d, records in parse_result(api_name, result, date)}
 
 # 사용 예시
 if __name__ == "__main__":
@@ -153,6 +326,7 @@ if __name__ == "__main__":
     grade = input("학년(필요시): ").strip() or None
     classnum = input("반(필요시): ").strip() or None
     info_type = input("정보 코드(inform API만): ").strip() or None
-    result = get_school_info(api_name, date=date, grade=grade, classnum=classnum, info_type=info_type)
+    school = resolve_school(input("학교 이름 또는 코드(비우면 기본 학교): ").strip() or None)
+    result = get_school_info(api_name, date=date, grade=grade, classnum=classnum, info_type=info_type, school=school)
     print("결과:")
     print(result)
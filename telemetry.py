@@ -0,0 +1,295 @@
+"""대화 한 턴의 단계별 지연 시간 측정
+
+`respond()`의 각 단계(날짜 변환, 첫 번째 모델 호출, 인자 검증, NEIS 조회, 파싱, 두 번째 모델 호출, 렌더링)를
+`span("단계")`로 감싸 소요 시간과 토큰 수, 캐시 적중 여부, NEIS 엔드포인트를 기록합니다.
+
+- 단계별 누적 지표: `prometheus_text()` (Prometheus 텍스트 형식), `TELEMETRY_PORT`를 주면 /metrics로 제공
+  (기본은 127.0.0.1에서만 열림. 다른 곳에서 수집하려면 `TELEMETRY_HOST=0.0.0.0`)
+- 턴별 기록: `TELEMETRY_TRACE_PATH` 파일에 JSON 한 줄씩 추가
+- 최근 기록의 p50/p95/p99: `summary()`
+
+현재 턴은 contextvars로 따라가므로 이벤트 루프와 `asyncio.to_thread`/NEIS 동시 조회 작업 스레드 모두에서
+같은 턴에 기록됩니다. 단계별 지표는 턴마다 그 단계에 쓴 시간의 합계로 한 번씩 쌓입니다.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STAGES = ("date_conversion", "first_llm", "validate", "neis_fetch", "parse", "second_llm", "render")
+# 지연 시간 히스토그램 구간(초)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 백분위 계산에 쓸 단계별 최근 기록 수
+RECENT_SAMPLES = 2048
+TRACE_PATH = os.getenv("TELEMETRY_TRACE_PATH", "")
+METRICS_PORT = int(os.getenv("TELEMETRY_PORT", "0"))
+METRICS_HOST = os.getenv("TELEMETRY_HOST", "127.0.0.1")
+
+_current_trace = contextvars.ContextVar("chatshhs_trace", default=None)
+_current_span = contextvars.ContextVar("chatshhs_span", default=None)
+
+
+class Span:
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = dict(attrs)
+        self.start = time.time()
+        self.duration = None
+
+    def to_dict(self):
+        with _attrs_lock:
+            attrs = dict(self.attrs)
+        return {"name": self.name, "start": round(self.start, 6), "duration": self.duration, **attrs}
+
+
+class Trace:
+    """대화 한 턴의 span 모음"""
+
+    def __init__(self, **attrs):
+        self.id = uuid.uuid4().hex[:16]
+        self.attrs = dict(attrs)
+        self.start = time.time()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self):
+        with self._lock:
+            spans = [s.to_dict() for s in self.spans]
+        with _attrs_lock:
+            attrs = dict(self.attrs)
+        return {"trace_id": self.id, "start": round(self.start, 6),
+                "duration": round(time.time() - self.start, 6), **attrs, "spans": spans}
+
+
+class Metrics:
+    """단계별 히스토그램/카운터. 여러 스레드에서 같이 써도 된다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}  # stage -> {"buckets": [구간별 누적 수..., +Inf], "sum", "count"}
+        self.recent = {}
+        self.counters = {}  # (metric, labels tuple) -> value
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            hist = self.histograms.setdefault(stage, {"buckets": [0] * (len(BUCKETS) + 1), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist["buckets"][i] += 1
+            hist["buckets"][-1] += 1
+            hist["sum"] += seconds
+            hist["count"] += 1
+            self.recent.setdefault(stage, deque(maxlen=RECENT_SAMPLES)).append(seconds)
+
+    def incr(self, metric, amount=1, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def percentiles(self, stage, points=(50, 95, 99)):
+        with self._lock:
+            samples = sorted(self.recent.get(stage, ()))
+        if not samples:
+            return {}
+        return {f"p{p}": samples[min(len(samples) - 1, int(len(samples) * p / 100))] for p in points}
+
+    def prometheus_text(self):
+        lines = ["# HELP chatshhs_stage_seconds 대화 단계별 소요 시간", "# TYPE chatshhs_stage_seconds histogram"]
+        with self._lock:
+            histograms = {k: {"buckets": list(v["buckets"]), "sum": v["sum"], "count": v["count"]}
+                          for k, v in self.histograms.items()}
+            counters = dict(self.counters)
+        for stage, hist in sorted(histograms.items()):
+            for bound, count in zip(BUCKETS + ("+Inf",), hist["buckets"]):
+                lines.append(f'chatshhs_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'chatshhs_stage_seconds_sum{{stage="{stage}"}} {hist["sum"]:.6f}')
+            lines.append(f'chatshhs_stage_seconds_count{{stage="{stage}"}} {hist["count"]}')
+        for name in sorted({metric for metric, _ in counters}):
+            lines.append(f"# TYPE chatshhs_{name}_total counter")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                    lines.append(f"chatshhs_{name}_total{{{label_text}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+_attrs_lock = threading.Lock()
+_trace_file_lock = threading.Lock()
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextlib.contextmanager
+def trace(turn=None, **attrs):
+    """대화 한 턴을 기록.
+
+    이미 진행 중인 턴이 있으면(또는 turn을 넘기면) 그 턴에 이어서 기록하고, 없을 때만 새로 만들어
+    끝날 때 단계별 지표에 반영하고 TELEMETRY_TRACE_PATH에 JSON 한 줄로 남긴다.
+    """
+    owner = False
+    if turn is None:
+        turn = _current_trace.get()
+    if turn is None:
+        turn, owner = Trace(**attrs), True
+    else:
+        annotate_trace(turn, **attrs)
+    token = _current_trace.set(turn)
+    try:
+        yield turn
+    finally:
+        _current_trace.reset(token)
+        if owner:
+            finish_trace(turn)
+
+
+def finish_trace(turn):
+    """턴의 단계별 소요 시간(같은 단계가 여러 번이면 합계)을 지표에 넣고 trace 한 줄을 남긴다."""
+    totals = {}
+    with turn._lock:
+        for s in turn.spans:
+            totals[s.name] = totals.get(s.name, 0.0) + (s.duration or 0.0)
+    for stage, seconds in totals.items():
+        metrics.observe(stage, seconds)
+    metrics.observe("turn", time.time() - turn.start)
+    write_trace(turn)
+
+
+def _close(current):
+    turn = _current_trace.get()
+    if turn is not None:
+        turn.add(current)
+    else:
+        # 턴 밖의 단계(prefetch 등)는 바로 지표에 반영
+        metrics.observe(current.name, current.duration)
+
+
+@contextlib.contextmanager
+def span(name, **attrs):
+    """단계 하나의 소요 시간을 기록. with 블록 안에서 `annotate`/`incr`로 속성을 더할 수 있다."""
+    current = Span(name, attrs)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        current.duration = round(time.perf_counter() - started, 6)
+        _current_span.reset(token)
+        _close(current)
+
+
+def record_span(name, seconds, **attrs):
+    """직접 잰 소요 시간을 span으로 기록 (콜백에 흩어진 시간을 합쳐 남길 때)"""
+    current = Span(name, attrs)
+    current.duration = round(seconds, 6)
+    _close(current)
+
+
+def annotate_trace(turn, **attrs):
+    with _attrs_lock:
+        turn.attrs.update(attrs)
+
+
+def annotate(**attrs):
+    """현재 span(없으면 현재 턴)에 속성을 붙인다. 둘 다 없으면 무시"""
+    target = _current_span.get() or _current_trace.get()
+    if target is not None:
+        with _attrs_lock:
+            target.attrs.update(attrs)
+
+
+def incr(attr, amount=1):
+    """현재 span의 숫자 속성을 더하고, 같은 이름의 누적 카운터도 올린다."""
+    current = _current_span.get()
+    if current is not None:
+        with _attrs_lock:
+            current.attrs[attr] = current.attrs.get(attr, 0) + amount
+        metrics.incr(attr, amount, stage=current.name)
+    else:
+        metrics.incr(attr, amount)
+
+
+def record_usage(usage):
+    """OpenAI 응답의 usage(토큰 수)를 현재 span에 기록"""
+    if usage is None:
+        return
+    for field in ("prompt_tokens", "completion_tokens"):
+        value = getattr(usage, field, None)
+        if value:
+            incr(field, value)
+
+
+def write_trace(turn, path=None):
+    path = TRACE_PATH if path is None else path
+    if not path:
+        return
+    line = json.dumps(turn.to_dict(), ensure_ascii=False)
+    try:
+        with _trace_file_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        logging.warning(f"trace 기록 실패: {e}")
+
+
+def summary():
+    """단계별 호출 수와 최근 p50/p95/p99 (초)"""
+    with metrics._lock:
+        counts = {stage: hist["count"] for stage, hist in metrics.histograms.items()}
+    return {stage: {"count": counts[stage], **metrics.percentiles(stage)}
+            for stage in STAGES + ("turn",) if stage in counts}
+
+
+def prometheus_text():
+    return metrics.prometheus_text()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """/metrics를 제공하는 HTTP 서버를 host:port에 백그라운드 스레드로 (한 번만) 시작. port가 0이면 하지 않는다."""
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                logging.warning(f"지표 서버를 시작하지 못했습니다 ({host}:{port}): {e}")
+                return None
+            threading.Thread(target=_server.serve_forever, name="telemetry-metrics", daemon=True).start()
+    return _server
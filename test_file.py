@@ -1,176 +1,79 @@
 #통합 코드
 
 import streamlit as st
-import requests
-import xml.etree.ElementTree as ET
 from openai import OpenAI
 import datetime
 import pytz
 import re
 import os
-#급식 정보 호출
-def lunch(date):
-  url="https://open.neis.go.kr/hub/mealServiceDietInfo"
-  # NEIS API 키 로드
-  try:
-    neis_key = st.secrets["neis"]["service_key"]
-  except:
-    neis_key = os.getenv("NEIS_API_KEY")
-  
-  if not neis_key:
+
+from schoolapi import call_school_api, get_neis_key
+from neis_parser import NeisError, parse_payload
+from assets import USER_AVATAR, data_uri, hero_image, static_url
+from school_fields import SCHOOL_INFO_FIELDS, field_label, resolve_fields
+from school_registry import resolve_school
+#NEIS 조회는 공통 계층(schoolapi: JSON 요청/캐시/재시도, neis_parser: RESULT 코드와 row 해석)을 사용
+def _neis_records(api_name, school=None, **kwargs):
+  """NEIS 응답을 레코드 리스트로. 키가 없으면 안내 문자열, 오류나 데이터 없음이면 빈 리스트"""
+  if not get_neis_key():
     return 'NEIS API 키가 설정되지 않음'
-  
-  params={
-      'KEY':neis_key,
-      'Type':'STRING',
-      'MLSV_YMD':date,
-      'pSize':'1',
-      'ATPT_OFCDC_SC_CODE':'J10',
-      'SD_SCHUL_CODE':'7530081'
-  }
-  response=requests.get(url,params=params)
-  response=response.text
-  if response.split('<MESSAGE>')[1].split('</MESSAGE>')[0]=='정상 처리되었습니다.':
-    return response.split('<DDISH_NM><![CDATA[')[1].split(']]></DDISH_NM>')[0]
-  else:
+  records = parse_payload(api_name, call_school_api(api_name, school=school, **kwargs))
+  if isinstance(records, NeisError):
+    return []
+  return records
+
+#학교: 주소의 ?school=학교이름또는코드 (없거나 찾지 못하면 기본 학교)
+def page_school():
+  if "school" not in st.session_state:
+    try:
+      st.session_state.school = resolve_school(st.query_params.get("school"))
+    except ValueError:
+      st.session_state.school = resolve_school()
+  return st.session_state.school
+
+#급식 정보 호출
+def lunch(date, school=None):
+  records = _neis_records("lunch", school=school, date=date)
+  if isinstance(records, str):
+    return records
+  if not records:
     return 'none'
+  return records[0].dishes
 
 #시간표
-def schedule(date, grade, classnum):
-  url="https://open.neis.go.kr/hub/hisTimetable"
-  # NEIS API 키 로드
-  try:
-    neis_key = st.secrets["neis"]["service_key"]
-  except:
-    neis_key = os.getenv("NEIS_API_KEY")
-  
-  if not neis_key:
-    return 'NEIS API 키가 설정되지 않음'
-  
-  params={
-      'KEY':neis_key,
-      'Type':'STRING',
-      'GRADE':grade,
-      'CLASS_NM':classnum,
-      'pSize':'20',
-      'ATPT_OFCDC_SC_CODE':'J10',
-      'SD_SCHUL_CODE':'7530081',
-      'ALL_TI_YMD':date
-  }
-  response=requests.get(url,params=params)
-  response=response.text
-  root = ET.fromstring(response)
-  if response.split('<MESSAGE>')[1].split('</MESSAGE>')[0]=='정상 처리되었습니다.':
-    def try_int(v):
-      try:
-          return int(v)
-      except (ValueError, TypeError):
-          return v
-
-    # 3) 모든 <row> 요소를 순회하며 딕셔너리로 변환
-    rows = root.findall('.//row')
-    result = ''
-    for row in range(1,len(rows)+1):
-       for child in rows[row-1]:
-        if child.tag=='ITRT_CNTNT':
-          result+=(str(row)+'교시: '+child.text.strip()+' ')
-
-    # 만약 첫 번째 <row>만 필요하면 result[0] 사용
-    return result
-  else:
+def schedule(date, grade, classnum, school=None):
+  records = _neis_records("schedule", school=school, date=date, grade=grade, classnum=classnum)
+  if isinstance(records, str):
+    return records
+  if not records:
     return 'none'
+  return ''.join(f"{i}교시: {p.subject} " for i, p in enumerate(records, 1))
 
-school_info_dict = {
-    "시도교육청코드": "ATPT_OFCDC_SC_CODE",
-    "시도교육청명": "ATPT_OFCDC_SC_NM",
-    "행정표준코드": "SD_SCHUL_CODE",
-    "학교명": "SCHUL_NM",
-    "영문학교명": "ENG_SCHUL_NM",
-    "학교종류명": "SCHUL_KND_SC_NM",
-    "시도명": "LCTN_SC_NM",
-    "관할조직명": "JU_ORG_NM",
-    "설립명": "FOND_SC_NM",
-    "도로명우편번호": "ORG_RDNZC",
-    "도로명주소": "ORG_RDNMA",
-    "도로명상세주소": "ORG_RDNDA",
-    "전화번호": "ORG_TELNO",
-    "홈페이지주소": "HMPG_ADRES",
-    "남녀공학구분명": "COEDU_SC_NM",
-    "팩스번호": "ORG_FAXNO",
-    "고등학교구분명": "HS_SC_NM",
-    "산업체특별학급존재여부": "INDST_SPECL_CCCCL_EXST_YN",
-    "고등학교일반전문구분명": "HS_GNRL_BUSNS_SC_NM",
-    "특수목적고등학교계열명": "SPCLY_PURPS_HS_ORD_NM",
-    "입시전후기구분명": "ENE_BFE_SEHF_SC_NM",
-    "주야구분명": "DGHT_SC_NM",
-    "설립일자": "FOND_YMD",
-    "개교기념일": "FOAS_MEMRD",
-    "수정일자": "LOAD_DTM"
-}
-
-
-#학교 기본 정보
-def inform(info_type):
-  url="https://open.neis.go.kr/hub/schoolInfo"
-  # NEIS API 키 로드
-  try:
-    neis_key = st.secrets["neis"]["service_key"]
-  except:
-    neis_key = os.getenv("NEIS_API_KEY")
-  
-  if not neis_key:
-    return 'NEIS API 키가 설정되지 않음'
-  
-  params={
-      'KEY':neis_key,
-      'Type':'STRING',
-      'pSize':'10',
-      'ATPT_OFCDC_SC_CODE':'J10',
-      'SD_SCHUL_CODE':'7530081'
-  }
-  response=requests.get(url,params=params)
-  response=response.text
-  root = ET.fromstring(response)
-
-# 2) 숫자로 보이는 문자열을 int로 변환해주는 헬퍼
-  def try_int(v):
-      try:
-          return int(v)
-      except (ValueError, TypeError):
-          return v
-
-  # 3) 첫 번째 <row> 요소를 찾아 딕셔너리로 변환
-  row = root.find('row')
-  row_dict = {}
-  if row is not None:
-      for child in row:
-          text = child.text.strip() if child.text else ''
-          row_dict[child.tag] = try_int(text)
-  return row_dict[info_type]
-def year_sch(date):
-  url="https://open.neis.go.kr/hub/SchoolSchedule"
-  # NEIS API 키 로드
-  try:
-    neis_key = st.secrets["neis"]["service_key"]
-  except:
-    neis_key = os.getenv("NEIS_API_KEY")
-  
-  if not neis_key:
-    return 'NEIS API 키가 설정되지 않음'
-  
-  params={
-      'KEY':neis_key,
-      'Type':'STRING',
-      'pSize':'1',
-      'ATPT_OFCDC_SC_CODE':'J10',
-      'SD_SCHUL_CODE':'7530081',
-      'AA_YMD':date
-  }
-  response=requests.get(url,params=params).text
-  if '해당하는' in response:
+# 한글 필드명 -> 필드 코드 사전은 school_fields에서 함께 쓴다.
+school_info_dict = SCHOOL_INFO_FIELDS
+
+
+#학교 기본 정보 (schoolInfo row 전체가 캐시에 남으므로 필드 여러 개도 한 번의 조회로 답한다)
+def inform(info_type, school=None):
+  records = _neis_records("inform", school=school)
+  if isinstance(records, str):
+    return records
+  if not records:
+    return 'None'
+  row = records[0].fields
+  if isinstance(info_type, list):
+    return ', '.join(f"{field_label(code)}: {row.get(code, 'None')}" for code in info_type)
+  return row.get(info_type, 'None')
+
+#학사일정
+def year_sch(date, school=None):
+  records = _neis_records("year_sch", school=school, date=date)
+  if isinstance(records, str):
+    return records
+  events = [e.name for e in records if e.name]
+  if not events:
     return 'None'
-  else:
-    return response.split('EVENT_NM')[1]
+  return ', '.join(events)
 
 def convert_relative_date_in_text(text, today_kst):
     """사용자 입력에서 상대 날짜 표현을 YYYYMMDD로 변환합니다."""
@@ -207,7 +110,8 @@ def convert_relative_date_in_text(text, today_kst):
     
     return converted_text
 
-def respond(prompt):
+def respond(prompt, school=None):
+    school = school or page_school()
     # 한국 시간대로 오늘 날짜 설정
     kst = pytz.timezone('Asia/Seoul')
     today_kst = datetime.datetime.now(kst).date()
@@ -230,7 +134,7 @@ def respond(prompt):
     client = OpenAI(api_key=api_key)
 
     messages = [
-        {"role": "system", "content": f'''너는 서현고등학교 구성원들을 돕는 유용한 ChatSHHS이고 오늘 날짜는 {today}이야.
+        {"role": "system", "content": f'''너는 {school.name} 구성원들을 돕는 유용한 ChatSHHS이고 오늘 날짜는 {today}이야.
 
 참고: 사용자가 "다음주 월요일" 같은 상대 날짜를 말하면, 이미 서버에서 절대 날짜(예: 2025년 12월 29일)로 변환되어 전달됩니다.
 
@@ -278,22 +182,27 @@ API 표:
                 res = res[5:]
                 res = res.split(", ")
                 if res[0] == "schedule":
-                    api_info = schedule(res[1], res[2], res[3])
+                    api_info = schedule(res[1], res[2], res[3], school=school)
                 elif res[0] == "inform":
-                    messages.append({"role": "system", "content": str(school_info_dict) + "\n이 딕셔너리에서 필요한 정보에 대해 반드시 영문코드'만' 출력해. 예:학교명 -> SCHUL_NM / 없다면 NONE"})
-                    dialogue = generate_dialogue(messages)
-                    messages.pop()
-                    for choice in dialogue.choices:
-                        message_content = choice.message.content.strip()
-                        res = message_content.split("\n\n")[0]
-                        if res == "NONE":
-                            api_info = "None"
-                        else:
-                            api_info = str(inform(res))
+                    # 필요한 필드는 사전/유사도 매칭으로 찾고, 못 찾을 때만 모델에게 묻는다.
+                    fields = resolve_fields(prompt)
+                    if fields:
+                        api_info = str(inform(fields, school=school))
+                    else:
+                        messages.append({"role": "system", "content": str(school_info_dict) + "\n이 딕셔너리에서 필요한 정보에 대해 반드시 영문코드'만' 출력해. 예:학교명 -> SCHUL_NM / 없다면 NONE"})
+                        dialogue = generate_dialogue(messages)
+                        messages.pop()
+                        for choice in dialogue.choices:
+                            message_content = choice.message.content.strip()
+                            res = message_content.split("\n\n")[0]
+                            if res == "NONE":
+                                api_info = "None"
+                            else:
+                                api_info = str(inform(res, school=school))
                 elif res[0] == "year_sch":
-                    api_info = year_sch(res[1])
+                    api_info = year_sch(res[1], school=school)
                 elif res[0] == "lunch":
-                    api_info = lunch(res[1])
+                    api_info = lunch(res[1], school=school)
 
                 messages.append({"role": "system", "content": f'''이 내용을 이용해 사용자의 질문에 답변해.*주의: 지금은 API를 불러오는 것이 아닌, 그 결과를 바탕으로 정확하게 답변할 때야
                 API 결과: {api_info}'''})
@@ -318,16 +227,20 @@ def process_user_prompt(prompt_text):
 
 
 
+# 로고/아바타는 static/의 작은 자산을 쓴다 (assets.py)
+HEADER_LOGO = static_url("header")
+ASSISTANT_AVATAR = data_uri("avatar")
+
 # UI 상태 변수
 if "show_chat" not in st.session_state:
     st.session_state.show_chat = False
 
 if not st.session_state.show_chat:
-    st.image("https://github.com/hajing09-dev/ChatSHHS/blob/main/seohyun.png?raw=true", width=400)
+    st.image(hero_image(), width=400)
     st.title("ChatSHHS")
-    st.markdown("""
+    st.markdown(f"""
     ## 안내 및 주의 사항
-    - 이 챗봇은 서현고등학교 관련 정보를 제공합니다.
+    - 이 챗봇은 {page_school().name} 관련 정보를 제공합니다.
     - 학교 공식 정보와 다를 수 있으니 참고용으로만 사용하세요.
     """) #안내문
     if st.button("채팅 시작하기"):
@@ -338,9 +251,9 @@ else:
         st.session_state.show_chat = False
         st.rerun()
     st.markdown(
-        """
+        f"""
         <div style='display: flex; align-items: center; gap: 10px;'>
-            <img src='https://github.com/hajing09-dev/ChatSHHS/blob/main/seohyun.png?raw=true' width='100'/>
+            <img src='{HEADER_LOGO}' width='100'/>
             <h1 style='margin:0;'>ChatSHHS</h1>
         </div>
         """,
@@ -368,7 +281,7 @@ else:
                 # 버튼 클릭 시 즉시 사용자 말풍선을 동일하게 렌더링한 뒤 프롬프트를 큐에 넣고 추천 질문은 다시 표시하지 않음
                 st.markdown(f"""
                 <div style='display:flex; flex-direction:row-reverse; align-items:center; text-align:right; background:#e0f7fa; padding:8px 16px; border-radius:12px; margin:8px 0 8px auto; max-width:70%; box-shadow:0 2px 8px #eee;'>
-                    <img src='https://cdn-icons-png.flaticon.com/512/1946/1946429.png' width='32' style='margin-left:8px; border-radius:50%;'/>
+                    <img src='{USER_AVATAR}' width='32' style='margin-left:8px; border-radius:50%;'/>
                     <div>
                         <b>나</b><br>{q}
                     </div>
@@ -394,7 +307,7 @@ else:
         if message["role"]=='assistant':
             st.markdown(f"""
             <div style='display:flex; align-items:center; text-align:left; background:#fffde7; padding:8px 16px; border-radius:12px; margin:8px 0; max-width:70%; box-shadow:0 2px 8px #eee;'>
-                <img src='https://github.com/hajing09-dev/ChatSHHS/blob/main/seohyun.png?raw=true' width='32' style='margin-right:8px; border-radius:50%;'/>
+                <img src='{ASSISTANT_AVATAR}' width='32' style='margin-right:8px; border-radius:50%;'/>
                 <div>
                     <b>ChatSHHS</b><br>{message['content']}
                 </div>
@@ -403,7 +316,7 @@ else:
         else:
             st.markdown(f"""
             <div style='display:flex; flex-direction:row-reverse; align-items:center; text-align:right; background:#e0f7fa; padding:8px 16px; border-radius:12px; margin:8px 0 8px auto; max-width:70%; box-shadow:0 2px 8px #eee;'>
-                <img src='https://cdn-icons-png.flaticon.com/512/1946/1946429.png' width='32' style='margin-left:8px; border-radius:50%;'/>
+                <img src='{USER_AVATAR}' width='32' style='margin-left:8px; border-radius:50%;'/>
                 <div>
                     <b>나</b><br>{message['content']}
                 </div>
@@ -0,0 +1,87 @@
+"""답변 캐시가 같은 조회를 묻는 다른 표현에는 같은 답을, 데이터 일부를 묻는 질문에는 새 답을 주는지 확인
+
+로컬 OpenAI/NEIS 대역 서버(`benchmarks/stub_servers.py`)에 대고 `ChatService.respond()`를 실제로 실행합니다.
+"""
+
+import datetime
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+import pytest  # noqa: E402
+
+import chat_service  # noqa: E402
+import neis_cache  # noqa: E402
+import school_registry  # noqa: E402
+import schoolapi  # noqa: E402
+from answer_cache import get_answer_cache  # noqa: E402
+from intent_router import question_kind, route  # noqa: E402
+from stub_servers import start_neis, start_openai  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def service():
+    neis, openai = start_neis("instant"), start_openai("instant")
+    # 다른 테스트가 schoolapi를 먼저 불러왔을 수 있으므로 환경 변수 대신 모듈 값을 직접 바꾼다.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("NEIS_API_KEY", "test")
+        mp.setenv("OPENAI_BASE_URL", f"{openai.url}/v1")
+        mp.setenv("OPENAI_API_KEY", "test")
+        mp.setattr(schoolapi, "BASE_URLS", {name: url.replace(schoolapi.NEIS_BASE_URL, f"{neis.url}/hub")
+                                            for name, url in schoolapi.BASE_URLS.items()})
+        mp.setattr(neis_cache, "_cache", neis_cache.NeisCache(path=None))
+        mp.setattr(school_registry, "_quota", school_registry.SchoolQuota(limit=0))
+        mp.setattr(chat_service, "USE_FAST_PATH", True)
+        mp.setattr(chat_service, "USE_ANSWER_CACHE", True)
+        mp.setattr(chat_service, "TEMPLATE_ANSWERS", False)
+        yield chat_service.ChatService(api_key="test"), openai
+    neis.close()
+    openai.close()
+
+
+@pytest.fixture(autouse=True)
+def empty_answer_cache(service):
+    get_answer_cache().clear()
+
+
+def ask(service, prompt):
+    svc, openai = service
+    openai.reset_counts()
+    answer = svc.respond(prompt, [])
+    return answer, sum(openai.reset_counts().values())
+
+
+def test_paraphrases_of_the_same_lookup_are_shared(service):
+    today = chat_service.today_kst()
+    questions = ["오늘 급식 뭐야", "오늘 점심 메뉴?", "급식 알려줘"]
+    assert len({str(route(q, today)) for q in questions}) == 1
+    ask(service, questions[0])
+    hits = get_answer_cache().stats()["hits"]
+    for question in questions[1:]:
+        _, openai_calls = ask(service, question)
+        assert openai_calls == 0
+    assert get_answer_cache().stats()["hits"] == hits + 2
+
+
+def test_item_specific_questions_are_not_cached(service):
+    today = chat_service.today_kst()
+    assert route("내일 급식 뭐야?", today) == route("내일 급식에 우유 나와?", today)
+    assert question_kind("내일 급식에 우유 나와?", today) == "specific"
+    ask(service, "내일 급식 뭐야?")
+    stats = get_answer_cache().stats()
+    for _ in range(2):
+        _, openai_calls = ask(service, "내일 급식에 우유 나와?")
+        assert openai_calls == 1
+    assert get_answer_cache().stats()["hits"] == stats["hits"]
+    assert get_answer_cache().stats()["writes"] == stats["writes"]
+
+
+def test_answer_is_not_reused_on_another_day(service, monkeypatch):
+    today = chat_service.today_kst()
+    ask(service, "오늘 급식 뭐야?")
+    hits = get_answer_cache().stats()["hits"]
+    monkeypatch.setattr(chat_service, "today_kst", lambda: today + datetime.timedelta(days=1))
+    ask(service, "오늘 급식 뭐야?")
+    assert get_answer_cache().stats()["hits"] == hits
@@ -0,0 +1,33 @@
+"""급식 템플릿 답변: 중식만 템플릿으로, 다른 끼니는 모델에게"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_templates import render_answer  # noqa: E402
+
+
+def meal_payload(*meals):
+    rows = [{"MLSV_YMD": "20251217", "MMEAL_SC_NM": m, "DDISH_NM": f"{m}밥<br/>김치"} for m in meals]
+    return {"mealServiceDietInfo": [
+        {"head": [{"list_total_count": len(rows)}, {"RESULT": {"CODE": "INFO-000", "MESSAGE": "정상 처리되었습니다."}}]},
+        {"row": rows},
+    ]}
+
+
+def test_lunch_template_picks_the_lunch_row():
+    answer = render_answer("lunch", meal_payload("조식", "중식", "석식"), "20251217")
+    assert "중식밥" in answer
+    assert "조식밥" not in answer and "석식밥" not in answer
+
+
+def test_day_without_lunch_row_is_left_to_the_model():
+    assert render_answer("lunch", meal_payload("석식"), "20251217") is None
+
+
+def test_question_about_another_meal_is_left_to_the_model():
+    payload = meal_payload("중식", "석식")
+    assert render_answer("lunch", payload, "20251217", question="오늘 석식 뭐야") is None
+    assert render_answer("lunch", payload, "20251217", question="내일 조식 메뉴") is None
+    assert render_answer("lunch", payload, "20251217", question="오늘 급식 뭐야") is not None
@@ -0,0 +1,39 @@
+"""상대 날짜 표현을 절대 날짜로 바꾸고 언급된 날짜 모으기"""
+
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from date_utils import resolve_relative_dates  # noqa: E402
+
+TODAY = datetime.date(2025, 12, 17)  # 수요일
+
+
+@pytest.mark.parametrize("text, converted, dates", [
+    ("내일 급식", "2025년 12월 18일 급식", ["20251218"]),
+    ("어제 급식", "2025년 12월 16일 급식", ["20251216"]),
+    ("다음주 화요일", "2025년 12월 23일", ["20251223"]),
+    ("다다음주 화요일", "2025년 12월 30일", ["20251230"]),
+    ("이번달 말", "2025년 12월 31일", ["20251231"]),
+    ("3일 후", "2025년 12월 20일", ["20251220"]),
+    ("12/25 일정", "2025년 12월 25일 일정", ["20251225"]),
+])
+def test_relative_dates_are_rewritten(text, converted, dates):
+    assert resolve_relative_dates(text, TODAY) == (converted, dates)
+
+
+def test_absolute_dates_are_kept_and_collected():
+    assert resolve_relative_dates("2026년 1월 5일 행사", TODAY) == ("2026년 1월 5일 행사", ["20260105"])
+
+
+def test_dates_are_unique_in_order_of_mention():
+    _, dates = resolve_relative_dates("모레하고 내일, 그리고 내일", TODAY)
+    assert dates == ["20251219", "20251218"]
+
+
+def test_text_without_dates_is_unchanged():
+    assert resolve_relative_dates("2학년 6반 시간표", TODAY) == ("2학년 6반 시간표", [])
@@ -0,0 +1,49 @@
+"""빠른 경로 분류기: 의도와 날짜/학년/반/필드 인자"""
+
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from intent_router import classify  # noqa: E402
+
+TODAY = datetime.date(2025, 12, 17)  # 수요일
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("오늘 급식 뭐야?", {"api_name": "lunch", "date": "20251217"}),
+    ("내일 점심 메뉴 알려줘", {"api_name": "lunch", "date": "20251218"}),
+    ("급식 알려줘", {"api_name": "lunch", "date": "20251217"}),
+    ("2학년 6반 내일 시간표", {"api_name": "schedule", "date": "20251218", "grade": 2, "classnum": 6}),
+    ("모레 1-3 시간표", {"api_name": "schedule", "date": "20251219", "grade": 1, "classnum": 3}),
+    ("학교 전화번호 알려줘", {"api_name": "inform", "info_type": "ORG_TELNO"}),
+    ("12월 26일에 무슨 행사 있어?", {"api_name": "year_sch", "date": "20251226"}),
+])
+def test_routes_common_questions_with_slots(text, expected):
+    assert classify(text, TODAY) == expected
+
+
+def test_week_expression_becomes_weekdays():
+    args = classify("이번 주 학사일정", TODAY)
+    assert args == {"api_name": "year_sch", "date": ["20251215", "20251216", "20251217", "20251218", "20251219"]}
+
+
+def test_several_dates_become_a_list():
+    args = classify("내일이랑 모레 급식 알려줘", TODAY)
+    assert args == {"api_name": "lunch", "date": ["20251218", "20251219"]}
+
+
+@pytest.mark.parametrize("text", [
+    "오늘 석식 뭐야",          # 끼니 구분이 필요한 질문
+    "내일 조식 메뉴",
+    "그럼 5반은?",             # 맥락이 필요한 후속 질문
+    "시간표 알려줘",           # 학년/반 없음
+    "학사일정 알려줘",         # 날짜 없는 일정 (범위가 모호함)
+    "급식이랑 시간표 알려줘",  # 의도가 둘
+    "안녕!",
+])
+def test_leaves_unclear_questions_to_the_model(text):
+    assert classify(text, TODAY) is None
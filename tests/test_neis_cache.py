@@ -0,0 +1,41 @@
+"""NeisCache 메모리 한도: 학교별 한도와 전체 한도"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neis_cache import NeisCache  # noqa: E402
+
+
+def fill(cache, school, count):
+    for d in range(count):
+        cache.set("lunch", f"202610{d:02d}", None, None, {"d": d}, school)
+
+
+def test_total_items_stay_under_max_items_across_schools():
+    cache = NeisCache(path=None, max_items=10, max_school_items=6)
+    for school in range(20):
+        fill(cache, str(school), 8)
+    stats = cache.stats()
+    assert stats["memory_items"] == 10
+    assert sum(len(memory) for memory in cache._memory.values()) == 10
+
+
+def test_least_recently_used_school_is_evicted_first():
+    cache = NeisCache(path=None, max_items=10, max_school_items=6)
+    fill(cache, "A", 5)
+    fill(cache, "B", 5)
+    assert cache.get("lunch", "20261000", school="A") is not None  # A를 최근에 씀
+    fill(cache, "C", 3)
+    assert cache.get("lunch", "20261004", school="A") is not None
+    assert cache.get("lunch", "20261000", school="B") is None
+
+
+def test_clear_one_school_keeps_the_count_right():
+    cache = NeisCache(path=None, max_items=10)
+    fill(cache, "A", 4)
+    fill(cache, "B", 3)
+    cache.clear("A")
+    assert cache.stats()["memory_items"] == 3
+    assert cache.get("lunch", "20261000", school="B") is not None
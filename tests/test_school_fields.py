@@ -0,0 +1,32 @@
+"""학교 기본 정보 질문에서 필드 코드 찾기"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from school_fields import resolve_fields  # noqa: E402
+
+
+@pytest.mark.parametrize("text, codes", [
+    ("학교 전화번호 알려줘", ["ORG_TELNO"]),
+    ("학교전화번호", ["ORG_TELNO"]),
+    ("홈페이지 주소", ["HMPG_ADRES"]),
+    ("도로명 상세 주소", ["ORG_RDNDA"]),
+    ("전화번호랑 주소 알려줘", ["ORG_TELNO", "ORG_RDNMA"]),
+    ("학교 위치 알려줘", ["ORG_RDNMA"]),
+    ("개교 기념일 언제야", ["FOAS_MEMRD"]),
+    ("설립년도 알려줘", ["FOND_YMD"]),
+    ("우리 학교 언제 세워졌어?", ["FOND_YMD"]),
+    ("시도 어디야", ["LCTN_SC_NM"]),
+    ("전화번 알려줘", ["ORG_TELNO"]),
+])
+def test_resolves_fields(text, codes):
+    assert resolve_fields(text) == codes
+
+
+@pytest.mark.parametrize("text", ["학교 주간 일정", "학교 급식실 위치", "교명 유래", "급식 알려줘"])
+def test_words_inside_other_questions_do_not_match(text):
+    assert resolve_fields(text) == []
@@ -0,0 +1,74 @@
+"""학교별 NEIS 호출 한도: 실제로 보낸 요청만 세고, single-flight로 결과를 나눠 받은 요청은 세지 않는다"""
+
+import os
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+import pytest  # noqa: E402
+
+import neis_client  # noqa: E402
+import school_registry  # noqa: E402
+import schoolapi  # noqa: E402
+from school_registry import DEFAULT_SCHOOL, QuotaExceeded, SchoolQuota  # noqa: E402
+from stub_servers import PROFILES, LatencyProfile, start_neis  # noqa: E402
+
+CONCURRENCY = 8
+
+
+@pytest.fixture
+def neis(monkeypatch):
+    # 요청이 진행 중인 동안 나머지가 모두 도착하도록 NEIS 응답을 조금 늦춘다.
+    server = start_neis(dict(PROFILES["instant"], neis=LatencyProfile(0.3)))
+    monkeypatch.setattr(neis_client, "_client", neis_client.NeisClient())
+    yield server
+    server.close()
+
+
+def lunch_request(neis):
+    url = schoolapi.BASE_URLS["lunch"].replace(schoolapi.NEIS_BASE_URL, f"{neis.url}/hub")
+    return url, schoolapi.build_params("lunch", "test", "20251217")
+
+
+def test_quota_limits_requests_per_school():
+    quota = SchoolQuota(limit=2, window=60)
+    assert quota.acquire("a") and quota.acquire("a")
+    assert not quota.acquire("a")
+    assert quota.acquire("b")
+    assert quota.stats()["a"] == {"recent": 2, "rejected": 1}
+
+
+def test_coalesced_fetches_charge_one_unit(neis, monkeypatch):
+    quota = SchoolQuota(limit=CONCURRENCY, window=60)
+    monkeypatch.setattr(school_registry, "_quota", quota)
+    url, params = lunch_request(neis)
+    barrier = threading.Barrier(CONCURRENCY)
+    results, errors = [], []
+
+    def fetch():
+        barrier.wait()
+        try:
+            results.append(schoolapi.fetch_json(url, dict(params)))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=fetch) for _ in range(CONCURRENCY)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(results) == CONCURRENCY and all(r is results[0] for r in results)
+    assert sum(neis.reset_counts().values()) == 1
+    assert quota.stats()[DEFAULT_SCHOOL.key] == {"recent": 1, "rejected": 0}
+
+
+def test_request_over_the_limit_is_not_sent(neis, monkeypatch):
+    monkeypatch.setattr(school_registry, "_quota", SchoolQuota(limit=1, window=60))
+    url, params = lunch_request(neis)
+    schoolapi.fetch_json(url, params)
+    with pytest.raises(QuotaExceeded):
+        schoolapi.fetch_json(url, params)
+    assert sum(neis.reset_counts().values()) == 1
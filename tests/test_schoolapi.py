@@ -0,0 +1,45 @@
+"""여러 날짜 조회를 기간 조회로 묶고 날짜별 응답으로 나누기"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schoolapi import NO_DATA_RESULT, plan_date_ranges, split_rows_by_date  # noqa: E402
+
+
+def test_consecutive_dates_become_one_range():
+    spans, invalid = plan_date_ranges(["20251217", "20251215", "20251216"])
+    assert spans == [("20251215", "20251217", ["20251215", "20251216", "20251217"])]
+    assert invalid == []
+
+
+def test_weekend_gap_is_bridged_but_long_gaps_are_not():
+    # 금요일과 다음 월요일은 3일 차이라 한 구간, 2주 뒤는 따로
+    spans, _ = plan_date_ranges(["20251212", "20251215", "20251229"])
+    assert spans == [("20251212", "20251215", ["20251212", "20251215"]),
+                     ("20251229", "20251229", ["20251229"])]
+
+
+def test_unparseable_dates_are_returned_separately():
+    spans, invalid = plan_date_ranges(["20251217", "내일", "20251340", "내일"])
+    assert spans == [("20251217", "20251217", ["20251217"])]
+    assert invalid == ["내일", "20251340"]
+
+
+def test_rows_are_split_by_date_with_no_data_for_missing_days():
+    rows = [{"MLSV_YMD": "20251215", "DDISH_NM": "밥"},
+            {"MLSV_YMD": "20251217", "DDISH_NM": "국"},
+            {"MLSV_YMD": "20251299", "DDISH_NM": "범위 밖"}]
+    out = split_rows_by_date("lunch", rows, ["20251215", "20251216", "20251217"])
+    assert list(out) == ["20251215", "20251216", "20251217"]
+    assert out["20251215"]["mealServiceDietInfo"][1]["row"] == [rows[0]]
+    assert out["20251215"]["mealServiceDietInfo"][0]["head"][0] == {"list_total_count": 1}
+    assert out["20251216"] == NO_DATA_RESULT
+    assert out["20251217"]["mealServiceDietInfo"][1]["row"] == [rows[1]]
+
+
+def test_timetable_rows_are_sorted_by_period():
+    rows = [{"ALL_TI_YMD": "20251215", "PERIO": "3"}, {"ALL_TI_YMD": "20251215", "PERIO": "1"}]
+    out = split_rows_by_date("schedule", rows, ["20251215"])
+    assert [r["PERIO"] for r in out["20251215"]["hisTimetable"][1]["row"]] == ["1", "3"]
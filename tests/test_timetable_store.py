@@ -0,0 +1,72 @@
+"""전교 시간표 행렬 캐시: 학교별로 한 번만 만들고, 빈 행렬은 저장하지 않는다"""
+
+import datetime
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import timetable_store  # noqa: E402
+from school_registry import DEFAULT_SCHOOL, School  # noqa: E402
+
+TODAY = datetime.date(2025, 12, 17)
+OTHER = School("B10", "7010536", "서울고등학교")
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """build_store 대신 과목 하나만 채운 행렬을 만들고, 학교별 생성 횟수를 센다."""
+    counts = {}
+    monkeypatch.setattr(timetable_store, "_stores", {})
+    monkeypatch.setattr(timetable_store, "_build_locks", {})
+    monkeypatch.setattr(timetable_store, "list_classes", lambda today, school: {2: [6]})
+
+    def build(dates, classes, school):
+        counts[school.key] = counts.get(school.key, 0) + 1
+        store = timetable_store.TimetableStore(dates, [(2, 6)])
+        store.cells[0] = store.intern("국어")
+        return store
+
+    monkeypatch.setattr(timetable_store, "build_store", build)
+    return counts
+
+
+def test_store_is_built_once_per_school_and_day(builds):
+    store = timetable_store.get_timetable_store(TODAY)
+    assert timetable_store.get_timetable_store(TODAY) is store
+    timetable_store.get_timetable_store(TODAY, school=OTHER)
+    timetable_store.get_timetable_store(TODAY + datetime.timedelta(days=1))
+    assert builds == {DEFAULT_SCHOOL.key: 2, OTHER.key: 1}
+
+
+def test_empty_store_is_not_cached(builds, monkeypatch):
+    monkeypatch.setattr(timetable_store, "list_classes", lambda today, school: {})
+    timetable_store.get_timetable_store(TODAY)
+    timetable_store.get_timetable_store(TODAY)
+    assert builds == {DEFAULT_SCHOOL.key: 2}
+
+
+def test_building_one_school_does_not_block_another(builds, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    build = timetable_store.build_store
+
+    def slow_build(dates, classes, school):
+        if school.key == DEFAULT_SCHOOL.key:
+            started.set()
+            release.wait(5)
+        return build(dates, classes, school)
+
+    monkeypatch.setattr(timetable_store, "build_store", slow_build)
+    threads = [threading.Thread(target=timetable_store.get_timetable_store, args=(TODAY,)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    assert started.wait(5)
+    # 서현고 행렬을 만드는 중에도 다른 학교는 바로 만들어진다.
+    timetable_store.get_timetable_store(TODAY, school=OTHER)
+    release.set()
+    for t in threads:
+        t.join()
+    assert builds == {DEFAULT_SCHOOL.key: 1, OTHER.key: 1}
@@ -0,0 +1,231 @@
+"""전교 시간표 행렬
+
+학년/반 × 날짜 × 교시마다 과목 ID(2바이트) 하나를 담은 `array` 행렬입니다. 과목명은 한 번만
+저장(intern)하고 칸에는 번호만 넣어, 한 달 치 전교 시간표도 수십 KB 안에 들어갑니다.
+반별 기간 조회(prefetch와 같은 방식)로 한 번에 채워 두면 아래 질문을 NEIS 호출 없이 답할 수 있습니다.
+
+- "내일 3교시에 체육 있는 반?"            -> `classes_with`
+- "2학년 6반 다음 영어 언제야?"           -> `next_occurrence`
+- "금요일 2-5랑 2-6 시간표 비교해줘"      -> `compare`
+"""
+
+import datetime
+import logging
+import os
+import re
+import threading
+import time
+from array import array
+
+from neis_parser import NeisError, parse_result
+from prefetch import KST, list_classes, upcoming_dates
+from school_registry import DEFAULT_SCHOOL
+from schoolapi import fetch_many
+
+# 하루 최대 교시 수, 행렬에 담을 기간(일), 다시 채우기 전까지 쓸 시간(초)
+MAX_PERIODS = 8
+STORE_DAYS = int(os.getenv("TIMETABLE_STORE_DAYS", "28"))
+STORE_TTL = 6 * 60 * 60
+EMPTY = 0
+
+
+class TimetableStore:
+    """학년/반 × 날짜 × 교시 과목 ID 행렬. 만든 뒤에는 읽기만 하므로 여러 스레드에서 같이 써도 된다."""
+
+    def __init__(self, dates, classes, max_periods=MAX_PERIODS):
+        self.dates = sorted(dates)
+        self.classes = sorted(classes)  # [(학년, 반), ...]
+        self.max_periods = max_periods
+        self.date_index = {d: i for i, d in enumerate(self.dates)}
+        self.class_index = {c: i for i, c in enumerate(self.classes)}
+        self.subjects = [""]  # ID 0은 빈 칸
+        self.subject_ids = {"": EMPTY}
+        self.cells = array("H", [EMPTY]) * (len(self.classes) * len(self.dates) * max_periods)
+        self.built_at = time.time()
+        self.built_for = None
+
+    @property
+    def row_size(self):
+        """반 하나가 차지하는 칸 수 (날짜 × 교시)"""
+        return len(self.dates) * self.max_periods
+
+    def _offset(self, class_i, date_i, period):
+        return class_i * self.row_size + date_i * self.max_periods + (period - 1)
+
+    def intern(self, subject):
+        subject = (subject or "").strip()
+        subject_id = self.subject_ids.get(subject)
+        if subject_id is None:
+            subject_id = self.subject_ids[subject] = len(self.subjects)
+            self.subjects.append(subject)
+        return subject_id
+
+    def put(self, grade, classnum, date, period, subject):
+        class_i = self.class_index.get((int(grade), int(classnum)))
+        date_i = self.date_index.get(date)
+        if class_i is None or date_i is None or not 1 <= period <= self.max_periods:
+            return False
+        self.cells[self._offset(class_i, date_i, period)] = self.intern(subject)
+        return True
+
+    def load_periods(self, periods):
+        """`neis_parser.Period` 레코드들을 행렬에 넣는다. 넣은 칸 수를 반환"""
+        return sum(self.put(p.grade, p.classnum, p.date, p.period, p.subject) for p in periods)
+
+    def subject_ids_like(self, subject):
+        """과목명이 subject를 포함하는 과목 ID 집합 ("영어" -> 영어, 영어Ⅱ, 실용영어 ...)"""
+        subject = (subject or "").replace(" ", "")
+        return {i for i, name in enumerate(self.subjects) if i != EMPTY and subject and subject in name.replace(" ", "")}
+
+    def day(self, grade, classnum, date):
+        """그날 한 반의 교시별 과목 리스트 (빈 교시는 빈 문자열, 뒤쪽 빈 교시는 잘라냄)"""
+        class_i = self.class_index.get((int(grade), int(classnum)))
+        date_i = self.date_index.get(date)
+        if class_i is None or date_i is None:
+            return []
+        start = self._offset(class_i, date_i, 1)
+        ids = self.cells[start:start + self.max_periods].tolist()
+        while ids and ids[-1] == EMPTY:
+            ids.pop()
+        return [self.subjects[i] for i in ids]
+
+    def classes_with(self, subject, date, period=None):
+        """그날 (그 교시에) subject 수업이 있는 반 리스트. [(학년, 반, 교시), ...]"""
+        wanted = self.subject_ids_like(subject)
+        date_i = self.date_index.get(date)
+        if not wanted or date_i is None:
+            return []
+        if period is not None and not 1 <= period <= self.max_periods:
+            # 범위 밖 교시는 옆 날짜(또는 다른 반)의 칸을 가리키므로 조회하지 않는다
+            return []
+        periods = [period] if period is not None else range(1, self.max_periods + 1)
+        found = []
+        for p in periods:
+            # 같은 날짜/교시 칸은 row_size 간격으로 놓여 있으므로 한 번의 슬라이스로 모든 반을 본다.
+            column = self.cells[self._offset(0, date_i, p)::self.row_size]
+            found += [(*self.classes[i], p) for i, subject_id in enumerate(column) if subject_id in wanted]
+        return sorted(found)
+
+    def next_occurrence(self, grade, classnum, subject, after_date, after_period=0):
+        """after_date의 after_period 다음부터 처음 나오는 subject 수업의 (날짜, 교시). 없으면 None"""
+        wanted = self.subject_ids_like(subject)
+        class_i = self.class_index.get((int(grade), int(classnum)))
+        if not wanted or class_i is None:
+            return None
+        first = next((i for i, d in enumerate(self.dates) if d >= after_date), None)
+        if first is None:
+            return None
+        skip = min(max(after_period, 0), self.max_periods) if self.dates[first] == after_date else 0
+        row_start = class_i * self.row_size
+        row = self.cells[row_start:row_start + self.row_size]
+        for index in range(first * self.max_periods + skip, self.row_size):
+            if row[index] in wanted:
+                return self.dates[index // self.max_periods], index % self.max_periods + 1
+        return None
+
+    def compare(self, classes, date):
+        """여러 반의 같은 날 시간표. {(학년, 반): [과목, ...]}"""
+        return {(int(g), int(c)): self.day(g, c, date) for g, c in classes}
+
+    def stats(self):
+        return {
+            "classes": len(self.classes),
+            "dates": len(self.dates),
+            "subjects": len(self.subjects) - 1,
+            "bytes": self.cells.itemsize * len(self.cells),
+            "filled": sum(1 for i in self.cells if i != EMPTY),
+        }
+
+
+def build_store(dates, classes, school=None):
+    """반별 기간 조회로 school(기본: DEFAULT_SCHOOL)의 dates 기간 전교 시간표를 받아 행렬을 만든다.
+
+    classes는 {학년: [반, ...]}. 조회는 `call_school_api`를 거치므로 캐시/동시 조회/기간 조회가 그대로 적용된다.
+    """
+    pairs = [(grade, c) for grade, nums in classes.items() for c in nums]
+    store = TimetableStore(dates, pairs)
+    results = fetch_many([dict(api_name="schedule", date=list(dates), grade=g, classnum=c, school=school)
+                          for g, c in pairs])
+    for (grade, classnum), result in zip(pairs, results):
+        for _, records in parse_result("schedule", result, list(dates)):
+            if isinstance(records, NeisError):
+                continue
+            # NEIS row의 GRADE/CLASS_NM이 비어 있어도 조회한 반으로 채운다.
+            store.load_periods(p._replace(grade=grade, classnum=classnum) for p in records)
+    logging.info(f"시간표 행렬 생성: {store.stats()}")
+    return store
+
+
+_stores = {}  # 학교 키 -> TimetableStore
+_build_locks = {}  # 학교 키 -> 그 학교 행렬을 만드는 동안 잡는 잠금
+_store_lock = threading.Lock()  # _stores, _build_locks
+
+
+def _is_fresh(store, today):
+    return store is not None and store.built_for == today and time.time() - store.built_at <= STORE_TTL
+
+
+def get_timetable_store(today=None, days=STORE_DAYS, school=None):
+    """school의 오늘(KST)부터 days일(평일) 치 전교 시간표 행렬. 날짜가 바뀌거나 STORE_TTL이 지나면 다시 만든다.
+
+    행렬은 학교별 잠금 안에서 만들므로 한 학교를 만드는 동안 다른 학교의 조회는 기다리지 않는다.
+    반 목록이나 시간표를 하나도 받지 못한 행렬은 저장하지 않고 다음 조회 때 다시 만든다.
+    """
+    today = today or datetime.datetime.now(KST).date()
+    school = school or DEFAULT_SCHOOL
+    with _store_lock:
+        store = _stores.get(school.key)
+        if _is_fresh(store, today):
+            return store
+        build_lock = _build_locks.setdefault(school.key, threading.Lock())
+    with build_lock:
+        # 기다리는 동안 다른 스레드가 만들었으면 그것을 쓴다.
+        with _store_lock:
+            store = _stores.get(school.key)
+        if _is_fresh(store, today):
+            return store
+        classes = list_classes(today, school)
+        store = build_store(upcoming_dates(days, today, weekdays_only=True), classes, school)
+        store.built_for = today
+        if classes and any(store.cells):
+            with _store_lock:
+                _stores[school.key] = store
+        return store
+
+
+def parse_class(value):
+    """"2-6", "2학년 6반", [2, 6] -> (2, 6)"""
+    if isinstance(value, (list, tuple)):
+        return int(value[0]), int(value[1])
+    numbers = re.findall(r"\d+", str(value))
+    if len(numbers) != 2:
+        raise ValueError(f"학년/반을 알 수 없음: {value}")
+    return int(numbers[0]), int(numbers[1])
+
+
+def run_query(args, today, school=None):
+    """`query_timetable` 함수 호출 인자로 school의 행렬을 조회해 결과 줄 리스트를 만든다."""
+    store = get_timetable_store(today, school=school)
+    kind = args.get("query_type")
+    date = args.get("date") or today.strftime("%Y%m%d")
+    subject = args.get("subject") or ""
+    if kind == "classes_with":
+        period = int(args["period"]) if args.get("period") else None
+        found = store.classes_with(subject, date, period)
+        if not found:
+            return [f"{date} : {subject} 수업이 있는 반이 없습니다."]
+        return [f"{date} : {g}학년 {c}반 {p}교시 {subject}" for g, c, p in found]
+    if kind == "next":
+        grade, classnum = int(args["grade"]), int(args["classnum"])
+        hit = store.next_occurrence(grade, classnum, subject, date, int(args.get("period") or 0))
+        if hit is None:
+            return [f"{grade}학년 {classnum}반 : {store.dates[-1] if store.dates else date}까지 {subject} 수업이 없습니다."]
+        return [f"{grade}학년 {classnum}반 다음 {subject} : {hit[0]} {hit[1]}교시"]
+    if kind == "compare":
+        classes = [parse_class(value) for value in args.get("classes") or []]
+        lines = []
+        for (g, c), subjects in store.compare(classes, date).items():
+            periods = ", ".join(f"{i}교시 {s or '-'}" for i, s in enumerate(subjects, 1)) or "시간표 정보 없음"
+            lines.append(f"{date} {g}학년 {c}반 : {periods}")
+        return lines
+    raise ValueError(f"알 수 없는 query_type: {kind}")